@@ -1,20 +1,15 @@
 import streamlit as st
 import gspread
-from google.oauth2.service_account import Credentials
 import pandas as pd
 import hashlib
 from datetime import datetime
 import time
+from sheet_client import CATALOG_SPREADSHEET, get_client, open_spreadsheet
 
 # --- Constants ---
 SHEET_CUSTOMERS = "고객정보"
 SHEET_WISHLIST = "찜목록"
 
-SCOPES = [
-    "https://www.googleapis.com/auth/spreadsheets",
-    "https://www.googleapis.com/auth/drive",
-]
-
 class AuthManager:
     def __init__(self):
         self.client = self._connect_google_sheets()
@@ -28,47 +23,22 @@ class AuthManager:
             'user_id', 'product_code', 'created_at'
         ])
 
-    @st.cache_resource
-    def _connect_google_sheets(_self):
-        """Connect to Google Sheets using Streamlit secrets."""
+    def _connect_google_sheets(self):
+        """Connect to Google Sheets using Streamlit secrets (shared client, see sheet_client.py)."""
         try:
-            creds = Credentials.from_service_account_info(
-                st.secrets["gcp_service_account"], scopes=SCOPES
-            )
-            return gspread.authorize(creds)
+            return get_client()
         except Exception as e:
             st.error(f"Google Sheets 연결 실패: {e}")
             return None
 
     def _get_or_open_spreadsheet(self):
         """Open the main spreadsheet."""
-        try:
-            # Try opening by name "상품목록" (as per data_loader.py logic context)
-            # OR list and pick first. To be safe, we assume "상품목록" exists or we find the right one.
-            # Ideally data_loader should share this, but for now we look for "DB_Products" or similar if known,
-            # but user said "saved to 'Customer Info' spreadsheet". 
-            # We will use the SAME spreadsheet as the product catalog for simplicity unless specified otherwise.
-            # Let's try to find a spreadsheet named "822Shop_DB" or just use the first one found if specific name unknown.
-            # Actually, `data_loader.py` logic prioritizes "상품목록". We should probably use that same spreadsheet file
-            # to keep everything in one place, or create a new one?
-            # User said "save to '고객정보' spreadsheet". It implies a sheet inside a file.
-            # Let's try to open "상품목록" file first.
-            
-            # For robustness, we search for the spreadsheet accessible.
-            # Since we validated write permissions on "상품목록" (or whatever file was found), we use that.
-            
-            # Simplified: List and take the first one, or search for "상품목록".
-            # NOTE: In data_loader.py, it searches for "상품목록".
-            for file in self.client.list_spreadsheet_files():
-                if file['name'] == "상품목록":
-                    return self.client.open_by_key(file['id'])
-            
-            # Fallback: Open the first one if "상품목록" not found (unlikely if app is running)
-            all_sheets = self.client.list_spreadsheet_files()
-            if all_sheets:
-                return self.client.open_by_key(all_sheets[0]['id'])
-                
+        # 고객정보/찜목록 탭은 상품 카탈로그와 같은 "상품목록" 파일에 둠 (data_loader.py와 동일)
+        # [MODIFIED] 매번 list_spreadsheet_files()로 찾지 않고 공용 리졸버의 캐시된 ID/핸들 사용
+        if self.client is None:
             return None
+        try:
+            return open_spreadsheet(CATALOG_SPREADSHEET)
         except Exception as e:
             st.error(f"스프레드시트 열기 실패: {e}")
             return None
@@ -251,3 +221,21 @@ class AuthManager:
             return counts
         except:
             return {}
+
+
+@st.cache_resource
+def _shared_auth_manager():
+    return AuthManager()
+
+
+def get_auth_manager():
+    """
+    Process-wide AuthManager (main.py). Avoids re-opening the spreadsheet on every rerun.
+    A connection failure leaves the handles None - that instance is not kept, so the
+    next rerun reconnects instead of failing logins/likes until a process restart.
+    """
+    am = _shared_auth_manager()
+    if am.sh is None or am.worksheet_customers is None or am.worksheet_wishlist is None:
+        print("[AuthManager] Sheets connection unavailable, will retry on next run")
+        _shared_auth_manager.clear()
+    return am
@@ -0,0 +1,85 @@
+"""
+bench_brand_normalizer.py
+-------------------------
+brand_normalizer.normalize_brands 마이크로 벤치마크 (앱에서는 import 하지 않음).
+
+10만 행 / 고유 브랜드 300개로 기존 행 단위 if-체인(apply)과 속도를 비교하고
+결과가 완전히 같은지 확인:
+    python bench_brand_normalizer.py
+"""
+
+import random
+import time
+
+import pandas as pd
+
+from brand_normalizer import BRAND_RULES, normalize_brand, normalize_brands
+
+
+def reference_normalize_brand(val):
+    """Previous per-row if-chain from data_loader.load_data (reference result for the equality check)."""
+    if not isinstance(val, str):
+        return str(val)
+    s = val.strip().lower()
+    if 'polo' in s or 'ralph lauren' in s:
+        return 'Polo'
+    if 'nike' in s or 'jordan' in s:
+        return 'Nike'
+    if 'adidas' in s:
+        return 'Adidas'
+    if 'new balance' in s or 'newbalance' in s:
+        return 'New Balance'
+    if 'national geographic' in s or 'nationalgeographic' in s:
+        return 'National Geographic'
+    if 'the north face' in s or 'north face' in s or 'thenorthface' in s:
+        return 'The North Face'
+    if 'cp company' in s or 'c.p' in s:
+        return 'C.P. Company'
+    if 'stone island' in s:
+        return 'Stone Island'
+    if 'patagonia' in s:
+        return 'Patagonia'
+    if 'lacoste' in s:
+        return 'Lacoste'
+    if 'tommy' in s:
+        return 'Tommy Hilfiger'
+    if 'marith' in s:
+        return 'Marithe'
+    if 'burberry' in s:
+        return 'Burberry'
+    if 'acmé' in s or 'acme' in s or 'adlv' in s:
+        return 'ADLV (Acme de la Vie)'
+    return val.strip().title()
+
+
+def benchmark(n_rows=100_000, n_distinct=300, repeat=3):
+    rng = random.Random(822)
+    keywords = [k for _, kws in BRAND_RULES for k in kws]
+    others = ['uniqlo', 'zara', 'levis', 'carhartt', 'stussy', 'supreme', 'beams', 'kangol']
+    distinct = []
+    for i in range(n_distinct):
+        base = rng.choice(keywords + others)
+        style = rng.choice(['{}', ' {} ', '{} vintage', 'old {}', '{} usa', '{}'.upper()])
+        distinct.append(style.format(base.upper() if i % 3 == 0 else base) + ('' if i % 5 else f' {i}'))
+    series = pd.Series([rng.choice(distinct) for _ in range(n_rows)])
+
+    def best_of(fn):
+        best = float('inf')
+        for _ in range(repeat):
+            normalize_brand.cache_clear()
+            t0 = time.perf_counter()
+            out = fn()
+            best = min(best, time.perf_counter() - t0)
+        return best, out
+
+    t_old, old = best_of(lambda: series.apply(reference_normalize_brand))
+    t_new, new = best_of(lambda: normalize_brands(series))
+
+    assert old.tolist() == new.tolist(), "normalize_brands result differs from reference"
+    print(f"rows={n_rows:,} distinct={series.nunique()}")
+    print(f"per-row apply   : {t_old * 1000:8.1f} ms")
+    print(f"normalize_brands: {t_new * 1000:8.1f} ms  ({t_old / t_new:.1f}x faster)")
+
+
+if __name__ == "__main__":
+    benchmark()
@@ -0,0 +1,87 @@
+"""
+brand_bar.py
+------------
+인기 브랜드 Top 10 바 (st.components.v2 컴포넌트 하나).
+
+기존에는 st.button 10개를 만들고 components_v1.html로 넣은 스크립트가
+부모 문서 전체의 button을 MutationObserver로 계속 훑어서 (\\u200b 표식) 스타일을 입혔음.
+→ 컴포넌트가 자기 버튼만 그리고 (텍스트 버튼, 5열), 클릭한 브랜드를 trigger 값으로 돌려줌.
+  문서 전체 탐색 / 옵저버 없음. 스타일은 shadow root 안에서만 적용.
+"""
+
+import streamlit as st
+
+BAR_CSS = """
+.brand-bar-label {
+    font-size: 11px; font-weight: 700; color: #888; letter-spacing: 0.08em;
+    margin-bottom: 5px; text-transform: uppercase;
+}
+.brand-bar { display: grid; grid-template-columns: repeat(5, minmax(0, 1fr)); gap: 4px 1rem; }
+@media (max-width: 640px) { .brand-bar { grid-template-columns: repeat(2, minmax(0, 1fr)); } }
+.brand-btn {
+    border: none; background: transparent; box-shadow: none; padding: 0; margin: 0;
+    color: #333; font: inherit; font-size: 17px; font-weight: 800; line-height: 1.5;
+    text-transform: uppercase; letter-spacing: 0.02em; cursor: pointer; text-align: center;
+    white-space: nowrap; overflow: hidden; text-overflow: ellipsis;
+}
+.brand-btn:hover, .brand-btn.active { color: #e63946; text-decoration: underline; }
+.brand-btn:focus { outline: none; }
+"""
+
+BAR_JS = """
+export default function(component) {
+    const { data, setTriggerValue, parentElement } = component;
+    let root = parentElement.querySelector('.brand-bar-root');
+    if (!root) {
+        root = document.createElement('div');
+        root.className = 'brand-bar-root';
+        parentElement.appendChild(root);
+    }
+    const signature = JSON.stringify(data);
+    if (root._signature !== signature) {
+        root._signature = signature;
+        root.replaceChildren();
+        const label = document.createElement('div');
+        label.className = 'brand-bar-label';
+        label.textContent = data.label;
+        const bar = document.createElement('div');
+        bar.className = 'brand-bar';
+        data.brands.forEach(([brand, count]) => {
+            const btn = document.createElement('button');
+            btn.className = 'brand-btn' + (data.selected.includes(brand) ? ' active' : '');
+            btn.dataset.brand = brand;
+            btn.textContent = `${brand} (${count})`;
+            btn.title = brand;
+            bar.appendChild(btn);
+        });
+        root.append(label, bar);
+    }
+    root.onclick = (e) => {
+        const btn = e.target.closest('.brand-btn');
+        if (btn) setTriggerValue('clicked', btn.dataset.brand);
+    };
+}
+"""
+
+_bar_component = None
+
+
+def _component():
+    global _bar_component
+    if _bar_component is None:
+        # isolate_styles는 기본값(True) 그대로 - card_grid._component 참고
+        _bar_component = st.components.v2.component("brand_bar", css=BAR_CSS, js=BAR_JS)
+    return _bar_component
+
+
+def render_brand_bar(brands, counts, selected, label, key, on_click):
+    """
+    브랜드 바 마운트. 클릭한 브랜드는 on_click 콜백에서
+    st.session_state[key]['clicked']로 읽음.
+    """
+    data = {
+        'label': label,
+        'brands': [[b, int(counts.get(b, 0))] for b in brands],
+        'selected': list(selected or []),
+    }
+    return _component()(data=data, key=key, on_clicked_change=on_click)
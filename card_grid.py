@@ -0,0 +1,284 @@
+"""
+card_grid.py
+------------
+상품 그리드 한 페이지를 HTML 한 덩어리로 만들어 커스텀 컴포넌트 하나로 그림.
+
+기존에는 카드마다 st.markdown / st.columns / st.button / st.expander를 따로 만들어서
+한 페이지(12개)에 Streamlit 요소가 100개 이상, 페이지를 넘길 때마다 그만큼의 델타가 전송됨.
+→ 카드 HTML을 전부 이어 붙여 st.components.v2 컴포넌트 하나에 data로 넘김 (델타 1개).
+  좋아요 / 상세 버튼 클릭은 컴포넌트가 trigger 값 {'type', 'code'}으로 돌려줌.
+
+카드 HTML(이미지, 오버레이, 가격, 코드 줄)은 상품 행 + 언어 + 카탈로그 버전에만
+의존하므로 LRU 캐시(lru.LRUCache)에 저장해 두고 이어 붙이기만 함.
+하트 상태 / 좋아요 수는 카드와 따로 보내서 컴포넌트가 버튼 글자만 바꿈
+→ 좋아요를 눌러도 바뀐 카드 DOM이 없음 (카탈로그 fragment만 다시 실행).
+상세 내용(설명, 비슷한 상품, LINE 문의)은 카드에 넣지 않고 상세 버튼을 누를 때만
+main.py의 상세 다이얼로그에서 만듦 (description_text / similar_strip_html / line_url).
+"""
+
+import html
+import urllib.parse
+
+import pandas as pd
+import streamlit as st
+
+from lru import LRUCache
+
+LINE_ID = "@102ipvys"
+
+GRID_CSS = """
+.card-grid { display: grid; grid-template-columns: repeat(3, minmax(0, 1fr)); gap: 0 1rem; }
+@media (max-width: 640px) { .card-grid { grid-template-columns: minmax(0, 1fr); } }
+.card { position: relative; min-width: 0; padding-bottom: 1rem; margin-bottom: 1rem; border-bottom: 1px solid rgba(49, 51, 63, 0.2); }
+.card.sold { opacity: 0.5; }
+.product-title {
+    font-family: 'GmarketSans', 'Montserrat', 'Kanit', sans-serif;
+    font-size: 1.1em; font-weight: bold; margin-top: 10px; margin-bottom: 5px;
+    display: -webkit-box; -webkit-line-clamp: 2; -webkit-box-orient: vertical;
+    overflow: hidden; text-overflow: ellipsis; height: 2.8em; line-height: 1.4em;
+}
+.product-price { font-weight: bold; font-size: 1.2em; }
+.card-meta { display: flex; align-items: flex-start; gap: 6px; }
+.card-meta .info { flex: 7; min-width: 0; }
+.card-meta .info div { white-space: nowrap; overflow: hidden; text-overflow: ellipsis; }
+.card-meta .code-line { font-size: 13px; color: #666; margin-top: 5px; }
+.card-meta .measured { font-size: 15px; color: #333; margin-top: 2px; font-weight: bold; }
+.like-btn {
+    flex: 3; min-height: 44px; border: 1px solid rgba(49, 51, 63, 0.2); border-radius: 8px;
+    background: #fff; font-size: 15px; cursor: pointer; white-space: nowrap;
+}
+.like-btn:hover { border-color: #ff4b4b; }
+.detail-btn {
+    width: 100%; min-height: 44px; margin-top: 8px; border: 1px solid rgba(49, 51, 63, 0.2);
+    border-radius: 8px; background: #fff; font-size: 15px; cursor: pointer; text-align: left; padding: 0 12px;
+}
+.detail-btn:hover { border-color: #ff4b4b; color: #ff4b4b; }
+"""
+
+GRID_JS = """
+function heartText(liked, count) {
+    return (liked ? '❤️' : '🤍') + ' ' + count;
+}
+
+export default function(component) {
+    const { data, setTriggerValue, parentElement } = component;
+    let root = parentElement.querySelector('.card-grid');
+    if (!root) {
+        root = document.createElement('div');
+        root.className = 'card-grid';
+        parentElement.appendChild(root);
+    }
+    // 바뀐 카드만 교체 (좋아요만 바뀐 rerun이면 카드 DOM은 그대로)
+    const prev = root._cards || [];
+    data.cards.forEach((card, i) => {
+        if (prev[i] === card && root.children[i]) return;
+        const tpl = document.createElement('template');
+        tpl.innerHTML = card;
+        const node = tpl.content.firstElementChild;
+        if (root.children[i]) root.replaceChild(node, root.children[i]);
+        else root.appendChild(node);
+    });
+    while (root.children.length > data.cards.length) root.lastElementChild.remove();
+    root._cards = data.cards;
+
+    // 하트 / 좋아요 수는 카드 HTML과 따로 받아서 버튼 글자만 갱신
+    root.querySelectorAll('.like-btn').forEach((btn, i) => {
+        const [liked, count] = data.hearts[i] || [false, 0];
+        btn.dataset.liked = liked ? '1' : '';
+        btn.dataset.count = count;
+        btn.textContent = heartText(liked, count);
+    });
+
+    // 카드마다 리스너를 달지 않고 root 하나에서 처리 (onclick 대입이라 렌더마다 교체됨)
+    root.onclick = (e) => {
+        const el = e.target.closest('[data-action]');
+        if (!el) return;
+        e.preventDefault();
+        if (el.dataset.action === 'like' && data.logged_in) {
+            // 서버 응답 전에 바로 반영 (fragment rerun 후 서버 값으로 다시 맞춰짐)
+            const liked = !el.dataset.liked;
+            const count = Math.max(0, Number(el.dataset.count) + (liked ? 1 : -1));
+            el.dataset.liked = liked ? '1' : '';
+            el.dataset.count = count;
+            el.textContent = heartText(liked, count);
+        }
+        setTriggerValue('action', { type: el.dataset.action, code: el.dataset.code, t: Date.now() });
+    };
+}
+"""
+
+_grid_component = None
+
+
+def _component():
+    global _grid_component
+    if _grid_component is None:
+        # 스타일은 shadow root 안에만 적용 (isolate_styles 기본값 True). 인자로는 넘기지 않음:
+        # 1.51은 마운트 시점에만, 최신 버전은 component()에서만 받음
+        _grid_component = st.components.v2.component("card_grid", css=GRID_CSS, js=GRID_JS)
+    return _grid_component
+
+
+def _blank(value):
+    return value is None or (not isinstance(value, str) and pd.isna(value)) or str(value).strip() in ('', '-')
+
+
+def description_text(row):
+    """description → product description → detail → '-'"""
+    for col in ('description', 'product description', 'detail'):
+        value = row.get(col)
+        if not _blank(value):
+            return str(value)
+    return '-'
+
+
+def similar_strip_html(catalog, code, T):
+    """'이런 상품은 어때요?' 썸네일 줄 (카탈로그 버전마다 미리 계산된 이웃 - similar_items.SimilarItems)"""
+    if catalog.similar is None:
+        return ''  # 콜드 스타트 직후 아직 빌드 중
+    rows = catalog.similar.similar_rows(code)
+    if not len(rows):
+        return ''
+    cells = []
+    for sim in catalog.take(rows).to_dict('records'):
+        img = sim['image_url'] or ''
+        img_html = (f'<img src="{html.escape(img)}" loading="lazy" style="width:100%; aspect-ratio:1; '
+                    f'object-fit:cover; object-position:top; border-radius:4px;">'
+                    if img else '<div style="width:100%; aspect-ratio:1; background:#eee; border-radius:4px;"></div>')
+        cells.append(
+            f'<div style="flex:1; min-width:0;">{img_html}'
+            f'<div style="font-size:11px; font-weight:700; color:#888; text-transform:uppercase; '
+            f'white-space:nowrap; overflow:hidden; text-overflow:ellipsis;">{html.escape(str(sim["brand"]))}</div>'
+            f'<div style="font-size:12px; white-space:nowrap; overflow:hidden; text-overflow:ellipsis;">'
+            f'{html.escape(str(sim["name"]))}</div>'
+            f'<div style="font-size:12px; font-weight:700;">{T["currency_symbol"]}{int(sim["price"]):,}</div></div>'
+        )
+    return (f'<p>{html.escape(T["similar_items"])}</p>'
+            f'<div style="display:flex; gap:6px;">{"".join(cells)}</div>')
+
+
+def _image_html(row, T):
+    """이미지 + 품절/도착예정 오버레이 + 할인율 뱃지"""
+    is_sold = bool(row['is_sold'])
+    img_url = row['image_url'] or None
+    if img_url:
+        img_html = f'<img src="{html.escape(img_url)}" style="width:100%; aspect-ratio: 9/8; object-fit: cover; object-position: top; border-radius:5px;" loading="lazy">'
+    else:
+        img_html = f'<div style="width:100%; aspect-ratio: 9/8; background:#f0f0f0; display:flex; align-items:center; justify-content:center; border-radius:5px;">{T["no_image"]}</div>'
+
+    if pd.isna(row['discount_pct']):
+        badge = ''
+    else:
+        badge = f'<div style="position:absolute; top:8px; right:8px; background:rgba(30,30,30,0.82); color:#fff; font-size:14px; font-weight:900; border-radius:6px; padding:4px 9px; z-index:20; letter-spacing:0.5px;">{row["discount_pct"]}%</div>'
+
+    if img_url:
+        img_html = f'<a href="{html.escape(img_url)}" target="_blank" style="display:block; cursor:pointer;">{img_html}</a>'
+
+    if is_sold:
+        overlay = f"""<div style="position: absolute; top: 50%; left: 50%; transform: translate(-50%, -50%);
+                    color: white; font-size: 20px; font-weight: bold;
+                    background-color: rgba(0,0,0,0.6); padding: 10px 20px; border-radius: 5px;
+                    pointer-events: none; white-space: nowrap; z-index: 10;">{T['sold_out']}</div>"""
+    elif bool(row['has_arrival_info']):
+        arrival = T['arrival_tbd'] if row['arrival_label'] == 'TBD' else html.escape(str(row['arrival_label']))
+        overlay = f"""<div style="position: absolute; bottom: 10px; left: 0; width: 100%;
+                    color: white; font-size: 20px; font-weight: bold;
+                    background-color: rgba(0,0,0,0.6); padding: 5px 0;
+                    pointer-events: none; z-index: 10; text-align: center;">{T['arrival_title']} : {arrival}</div>"""
+    else:
+        overlay = ''
+    return f'<div style="position: relative; width: 100%;">{img_html}{overlay}{badge}</div>'
+
+
+def _price_html(row, T):
+    """판매가 (할인 상품은 출고가 취소선 + 판매가 파란색, 품절은 회색 취소선)"""
+    price_plain = f"{T['currency_symbol']}{row.get('price', 0):,}"
+    if bool(row['is_sold']):
+        return f"<span style='color:#999; text-decoration:line-through; font-size:16px;'>{T['sold_out']}</span>"
+    if not pd.isna(row['discount_pct']):
+        orig_plain = f"{T['currency_symbol']}{int(row['original_price']):,}"
+        return (f"<span style='color:#aaa; text-decoration:line-through; font-size:14px; margin-right:5px;'>{orig_plain}</span>"
+                f"<span style='color:#007bff; font-weight:900; font-size:20px;'>{price_plain}</span>")
+    return f"<span style='color:#007bff; font-weight:bold; font-size:20px;'>{price_plain}</span>"
+
+
+def line_url(row, T, user):
+    """LINE 공식계정 문의 링크 (상품 정보 + 사용자 정보가 들어간 메시지)"""
+    contact_text = T['contact_msg'].format(
+        code=row.get('code', '-'), brand=row.get('brand', 'Unknown'), name=row.get('name', 'No Name'),
+        price=f"{T['currency_symbol']}{row.get('price', 0):,}",
+        user_id=user['user_id'], user_name=user.get('name', 'Unknown'))
+    return f"https://line.me/R/oaMessage/{LINE_ID}/?{urllib.parse.quote(contact_text)}"
+
+
+def _card_html(row, T):
+    """
+    카드 하나의 HTML (상품 행 + 언어 + 카탈로그 버전에만 의존 → 캐시).
+    좋아요 버튼은 빈 채로 두고 하트 / 건수는 컴포넌트가 따로 받아서 채움.
+    """
+    code = str(row.get('code', '-'))
+    esc_code = html.escape(code)
+    brand = html.escape(str(row.get('brand', 'Unknown')))
+    name = html.escape(str(row.get('name', 'No Name')))
+    is_sold = bool(row['is_sold'])
+
+    measured = row.get('measured_size', '-')
+    measured_html = ''
+    if not _blank(measured) and str(measured).lower() != 'nan':
+        measured_html = f"<div class='measured'>{T['measured_size']} : {html.escape(str(measured))}</div>"
+
+    return f"""<div class="card{' sold' if is_sold else ''}">
+{_image_html(row, T)}
+<div class='product-title'>[{brand}] {name}</div>
+<div class='product-price'>{_price_html(row, T)}</div>
+<div class='card-meta'>
+  <div class='info'>
+    <div class='code-line'>Code : {esc_code} | {T['size']} : {html.escape(str(row.get('size', '-')))} | Cond : {html.escape(str(row.get('condition', '-')))}</div>
+    {measured_html}
+  </div>
+  <button class='like-btn' data-action='like' data-code="{esc_code}" title="Add to Wishlist"></button>
+</div>
+<button class='detail-btn' data-action='detail' data-code="{esc_code}">{T['detail_btn']}</button>
+</div>"""
+
+
+# ──────────────────────────────────────────────────────
+# 카드 HTML 캐시 (제품번호, 언어, 카탈로그 버전) → 카드 HTML
+# ──────────────────────────────────────────────────────
+# 캐시할 최대 카드 수 (언어 3개 × 자주 보는 상품들)
+CARD_CACHE_SIZE = 4096
+
+# 모든 세션이 같이 씀. 키에 카탈로그 버전이 있어서 새 버전이 오면 이전 카드는 자연히 밀려남
+_card_cache = LRUCache(max_entries=CARD_CACHE_SIZE)
+
+
+def get_card_cache():
+    return _card_cache
+
+
+def page_payload(page_items, T, lang, catalog, like_counts, my_likes, user):
+    """
+    한 페이지 컴포넌트 data: {'cards': 카드 HTML 목록, 'hearts': [[좋아요 여부, 건수], ...], 'logged_in'}.
+    카드는 캐시에서 꺼내 그대로 보내고, 사용자별 하트는 따로 보냄.
+    """
+    codes = page_items['code'].astype(str).tolist() if 'code' in page_items.columns else []
+    records = None
+    cards, hearts = [], []
+    for i, code in enumerate(codes):
+        key = (code, lang, catalog.version)
+        card = _card_cache.get(key)
+        if card is None:
+            if records is None:
+                records = page_items.to_dict('records')
+            card = _card_cache.put(key, _card_html(records[i], T))
+        cards.append(card)
+        hearts.append([code in my_likes, int(like_counts.get(code, 0))])
+    return {'cards': cards, 'hearts': hearts, 'logged_in': bool(user)}
+
+
+def render_card_grid(payload, key, on_action):
+    """
+    그리드 컴포넌트 마운트. 클릭은 on_action 콜백에서
+    st.session_state[key]['action'] ({'type': 'like'|'detail', 'code': ...})으로 읽음.
+    """
+    return _component()(data=payload, key=key, on_action_change=on_action)
@@ -0,0 +1,121 @@
+"""
+catalog.py
+----------
+프로세스 전체가 공유하는 읽기 전용 카탈로그 버전 객체.
+
+st.cache_data는 rerun마다 DataFrame 전체를 역직렬화해서 새 사본을 만들고,
+main.py는 그 위에 다시 df.copy()를 했음. 이제 카탈로그는 버전당 한 번만
+만들어서 (CatalogRefresher가 워커 스레드에서 교체) 모든 세션이 같은 객체를 읽고,
+세션은 행 번호(row id) 배열과 현재 페이지 몇 행만 다룬다.
+
+필터/정렬/배 인덱스는 생성자에서 바로 (수십 ms), 검색/자동완성/비슷한 상품 인덱스는
+비싸서 (10만 행에서 십여 초) build_text_indexes()로 따로 만든다 - CatalogRefresher의
+워커 스레드가 스냅샷 카탈로그를 먼저 내보낸 뒤 빌드하고, 준비되기 전에는 None.
+"""
+
+import itertools
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+from catalog_index import CohortIndex, FacetIndex, SortIndex
+from catalog_search import PrefixIndex, SearchIndex
+from similar_items import SimilarItems
+
+_version_counter = itertools.count(1)
+
+
+def _freeze(df):
+    """
+    Rebuild the frame on read-only NumPy arrays (no consolidation), so an accidental
+    in-place write from a session raises instead of silently changing shared data.
+    Extension columns (category, Float32, str) keep their own arrays.
+    """
+    columns = {}
+    for col in df.columns:
+        s = df[col]
+        if isinstance(s.dtype, np.dtype):
+            arr = s.to_numpy(copy=True)
+            arr.flags.writeable = False
+            columns[col] = pd.Series(arr, name=col, copy=False)
+        else:
+            columns[col] = s.reset_index(drop=True)
+    frozen = pd.DataFrame(columns, copy=False)
+    frozen.attrs.update(df.attrs)
+    return frozen
+
+
+class Catalog:
+    """
+    One immutable catalog version.
+
+    - df      : shared read-only DataFrame (never copy or mutate it in a session)
+    - version : increases every time a new catalog is swapped in; use it in cache keys
+    - facets  : FacetIndex (packed bitset per facet value), built once per version
+    - sorts   : SortIndex (presorted row-id permutation per sort key)
+    - cohorts : CohortIndex (ETA date -> row ids / counts, per ship)
+    Text indexes (None until build_text_indexes() has run):
+    - search  : SearchIndex (2/3-gram inverted index over name/brand/code/description/categories)
+    - autocomplete : PrefixIndex (brands / categories / name words, most frequent first)
+    - similar : SimilarItems (top-k similar row ids per product)
+    """
+
+    def __init__(self, df, text_indexes=True):
+        self.df = _freeze(df) if not df.empty else df
+        self.version = next(_version_counter)
+        self.built_at = time.time()
+        t0 = time.perf_counter()
+        self.cohorts = CohortIndex(self.df)
+        self.facets = FacetIndex(self.df, cohorts=self.cohorts)
+        self.sorts = SortIndex(self.df)
+        # 인덱스 빌드 시간 (ms) - 콘솔 대신 디버그 모드 화면에 표시 (main.py)
+        self.build_ms = {'facets/sorts': round((time.perf_counter() - t0) * 1000, 1)}
+
+        self.search = None
+        self.autocomplete = None
+        self.similar = None
+        self._text_lock = threading.Lock()
+        if text_indexes:
+            self.build_text_indexes()
+
+    @property
+    def text_ready(self):
+        return self.similar is not None
+
+    def build_text_indexes(self):
+        """Build search / autocomplete / similar items (slow; idempotent, thread-safe)."""
+        with self._text_lock:
+            if self.text_ready:
+                return
+            t0 = time.perf_counter()
+            search = SearchIndex(self.df)
+            autocomplete = PrefixIndex(self.df)
+            t1 = time.perf_counter()
+            similar = SimilarItems(self.df)
+            t2 = time.perf_counter()
+            # 참조 대입으로 교체 → 읽는 쪽은 None 아니면 완성된 인덱스만 봄 (similar가 마지막 = 준비 완료)
+            self.search = search
+            self.autocomplete = autocomplete
+            self.similar = similar
+            self.build_ms['search'] = round((t1 - t0) * 1000, 1)
+            self.build_ms['similar'] = round((t2 - t1) * 1000, 1)
+
+    def __len__(self):
+        return len(self.df)
+
+    @property
+    def empty(self):
+        return self.df.empty
+
+    def take(self, row_ids):
+        """Materialize only the given rows (e.g. the current page)."""
+        return self.df.iloc[row_ids]
+
+    def row(self, code):
+        """One product row by product code (None if the code is not in this version)."""
+        row_id = self.sorts.row_of_code.get(str(code))
+        if row_id is None:
+            return None
+        return self.df.iloc[row_id]
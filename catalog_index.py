@@ -0,0 +1,283 @@
+"""
+catalog_index.py
+----------------
+카탈로그 버전당 한 번 만드는 인덱스 모음 (Catalog 생성 시 워커 스레드에서 빌드).
+
+FacetIndex: 브랜드/카테고리/사이즈 값마다, 그리고 품절/도착정보 플래그마다
+            np.packbits로 압축한 비트셋을 미리 만들어 둠.
+            필터 조회 = 비트 OR/AND 몇 번 + 마지막에 행 번호로 한 번 변환.
+            facet_counts()는 현재 선택 조건에서 패싯 값별 건수 ("Nike (42)")를
+            계산하고 조건 조합마다 LRU로 캐시 (사이드바 멀티셀렉트 / 인기 브랜드 바).
+SortIndex:  정렬 키마다 안정 정렬 순열(행 번호 배열)을 미리 계산.
+            필터 결과 정렬 = 순열을 마스크로 걸러내기 (O(n), 날짜 파싱/비교 정렬 없음).
+CohortIndex: 도착 예정일(배) 단위 묶음 - 파싱된 ETA 날짜 → 행 번호 / 건수.
+            선박 트래커, "도착한 상품만" 필터, "이 배로 오는 상품" 보기가 같이 사용.
+"""
+
+import hashlib
+
+import numpy as np
+import pandas as pd
+
+from lru import LRUCache
+
+FACET_COLUMNS = ['brand', 'upper_category', 'category', 'size']
+
+# facet_counts 결과 캐시 크기 (조건 조합 수, 카탈로그 버전마다 새로 시작)
+FACET_COUNT_CACHE_SIZE = 256
+
+# 정렬 이름 → (컬럼, 오름차순 여부). 빈 값(NaT/NaN)은 항상 맨 뒤
+SORT_KEYS = {
+    'Newest': ('updated_at_dt', False),
+    'Price_Low': ('price', True),
+    'Price_High': ('price', False),
+    'Name': ('name', True),
+    'Discount': ('discount_pct', False),
+}
+
+# filter_bits 인자 이름 ↔ 패싯 컬럼
+_SELECTION_ARGS = (('brands', 'brand'), ('upper', 'upper_category'),
+                   ('categories', 'category'), ('sizes', 'size'))
+
+
+def _pack(mask):
+    return np.packbits(np.asarray(mask, dtype=bool))
+
+
+class CohortIndex:
+    """
+    Shipment cohorts: unique parsed ETA date (ISO 'YYYY-MM-DD') -> row ids / item count.
+    Uses arrival_dt from catalog_schema (parsed once per unique value) and has_arrival_info
+    from data_loader.derive_display_columns; rows with ETA text but no date ('TBD') are
+    pending but belong to no dated cohort.
+    """
+
+    def __init__(self, df):
+        self.n = len(df)
+        if 'has_arrival_info' in df.columns:
+            pending = df['has_arrival_info'].to_numpy(dtype=bool)
+        else:
+            pending = np.zeros(self.n, dtype=bool)
+        self.pending = pending          # ETA 정보가 있음 (아직 도착 안 함)
+        self.arrived = ~pending         # "도착한 상품만" 필터
+
+        self.rows = {}      # {iso date: row ids}
+        self.counts = {}    # {iso date: item count}
+        self.dates = {}     # {iso date: datetime}
+        if 'arrival_dt' in df.columns:
+            days = pd.to_datetime(df['arrival_dt']).dt.normalize()
+            codes, uniques = pd.factorize(days, sort=True)   # NaT -> -1, 날짜 오름차순
+            order = np.argsort(codes, kind='stable')
+            bounds = np.searchsorted(codes[order], np.arange(len(uniques) + 1))
+            for k, day in enumerate(uniques):
+                rows = order[bounds[k]:bounds[k + 1]].astype(np.int32)
+                iso = day.date().isoformat()
+                self.rows[iso] = rows
+                self.counts[iso] = len(rows)
+                self.dates[iso] = day.to_pydatetime()
+
+    def keys(self):
+        """Cohort keys (ISO dates), oldest first."""
+        return list(self.rows)
+
+    def arrival_dates(self):
+        """One datetime per ship, for ship_tracker_web (no re-parsing)."""
+        return [self.dates[k] for k in self.rows]
+
+    def ids(self, key):
+        return self.rows.get(key, np.zeros(0, dtype=np.int32))
+
+    def mask(self, key):
+        mask = np.zeros(self.n, dtype=bool)
+        mask[self.ids(key)] = True
+        return mask
+
+
+class FacetIndex:
+    """Packed bitset per facet value + per status flag, for one catalog version."""
+
+    def __init__(self, df, columns=FACET_COLUMNS, cohorts=None):
+        self.n = len(df)
+        self.bitsets = {}   # {column: {value(str): packed bits}}
+        self.counts = {}    # {column: {value(str): row count}}  (전체 카탈로그 기준)
+        self.codes = {}     # {column: int codes per row}  (facet_counts의 bincount용)
+        self.values = {}    # {column: [value(str) per code]}
+
+        for col in columns:
+            if col not in df.columns:
+                continue
+            codes, uniques = pd.factorize(df[col].astype(str))
+            order = np.argsort(codes, kind='stable')
+            bounds = np.searchsorted(codes[order], np.arange(len(uniques) + 1))
+            col_bits, col_counts = {}, {}
+            for k, value in enumerate(uniques):
+                rows = order[bounds[k]:bounds[k + 1]]
+                mask = np.zeros(self.n, dtype=bool)
+                mask[rows] = True
+                col_bits[str(value)] = _pack(mask)
+                col_counts[str(value)] = len(rows)
+            self.bitsets[col] = col_bits
+            self.counts[col] = col_counts
+            self.codes[col] = codes
+            self.values[col] = [str(v) for v in uniques]
+
+        self.all_bits = _pack(np.ones(self.n, dtype=bool))
+        self.none_bits = np.zeros_like(self.all_bits)
+        self.flags = {}
+        if 'is_out_of_stock' in df.columns:
+            self.flags['is_out_of_stock'] = _pack(df['is_out_of_stock'].to_numpy(dtype=bool))
+
+        # 도착 정보 / 배(도착 예정일)별 비트셋은 CohortIndex에서
+        cohorts = cohorts if cohorts is not None else CohortIndex(df)
+        self.flags['has_arrival_info'] = _pack(cohorts.pending)
+        self.ship_bits = {key: _pack(cohorts.mask(key)) for key in cohorts.keys()}
+        self.price = df['price'].to_numpy() if 'price' in df.columns else None
+
+        self._count_cache = LRUCache(max_entries=FACET_COUNT_CACHE_SIZE)
+
+    def values_bits(self, column, values):
+        """OR of the bitsets of the selected values (unknown values match nothing)."""
+        col_bits = self.bitsets.get(column, {})
+        parts = [col_bits[v] for v in map(str, values) if v in col_bits]
+        if not parts:
+            return self.none_bits
+        return np.bitwise_or.reduce(parts)
+
+    def to_ids(self, bits):
+        """Packed bits -> row ids (the one final gather)."""
+        return np.flatnonzero(np.unpackbits(bits, count=self.n))
+
+    def filter_bits(self, brands=None, upper=None, categories=None, sizes=None,
+                    price_range=None, hide_sold_out=False, arrived_only=False, ship=None,
+                    include_mask=None, skip=None):
+        """
+        AND of all active filters as packed bits.
+        ship: cohort key (ETA date) - only items on that ship.
+        include_mask: extra boolean row mask (search hits, wishlist ...).
+        skip: facet column to leave out (facet counts exclude their own selection).
+        """
+        bits = self.all_bits
+        selections = {'brands': brands, 'upper': upper, 'categories': categories, 'sizes': sizes}
+        for arg, column in _SELECTION_ARGS:
+            selected = selections[arg]
+            if selected and column != skip and column in self.bitsets:
+                bits = bits & self.values_bits(column, selected)
+
+        if hide_sold_out and 'is_out_of_stock' in self.flags:
+            bits = bits & ~self.flags['is_out_of_stock']
+        if arrived_only and 'has_arrival_info' in self.flags:
+            # "도착한 상품만" = 도착예정일 정보가 없는 상품
+            bits = bits & ~self.flags['has_arrival_info']
+
+        if ship:
+            bits = bits & self.ship_bits.get(ship, self.none_bits)
+
+        if price_range is not None and self.price is not None:
+            lo, hi = price_range
+            bits = bits & _pack((self.price >= lo) & (self.price <= hi))
+
+        if include_mask is not None:
+            bits = bits & _pack(include_mask)
+        return bits
+
+    def query(self, **filters):
+        """Row ids matching every active filter (see filter_bits for the arguments)."""
+        return self.to_ids(self.filter_bits(**filters))
+
+    def filter_mask(self, **filters):
+        """Boolean row mask of filter_bits (input for SortIndex.sorted_ids)."""
+        return np.unpackbits(self.filter_bits(**filters), count=self.n).view(bool)
+
+    # ──────────────────────────────────────────────────────
+    # 패싯 건수 (현재 선택 조건 기준)
+    # ──────────────────────────────────────────────────────
+    def _count_key(self, filters):
+        key = []
+        for arg, _ in _SELECTION_ARGS:
+            key.append(tuple(sorted(set(map(str, filters.get(arg) or ())))))
+        price_range = filters.get('price_range')
+        key.append(tuple(price_range) if price_range is not None else None)
+        key.append(bool(filters.get('hide_sold_out')))
+        key.append(bool(filters.get('arrived_only')))
+        key.append(filters.get('ship'))
+        include_mask = filters.get('include_mask')
+        if include_mask is not None:
+            # 검색/위시리스트 마스크는 내용 해시로 키에 포함
+            key.append(hashlib.blake2b(_pack(include_mask).tobytes(), digest_size=16).hexdigest())
+        else:
+            key.append(None)
+        return tuple(key)
+
+    def facet_counts(self, **filters):
+        """
+        {column: {value: count}} for every facet under the current filters.
+        Each facet ignores its own selection (so picking 'Nike' doesn't zero out
+        the other brands), but respects every other active filter.
+        Cached per filter combination (LRU, FACET_COUNT_CACHE_SIZE entries).
+        """
+        def compute():
+            result = {}
+            for arg, column in _SELECTION_ARGS:
+                if column not in self.codes:
+                    continue
+                ids = self.to_ids(self.filter_bits(**filters, skip=column))
+                counts = np.bincount(self.codes[column][ids], minlength=len(self.values[column]))
+                result[column] = dict(zip(self.values[column], counts.tolist()))
+            return result
+
+        return self._count_cache.get_or_compute(self._count_key(filters), compute)
+
+
+class SortIndex:
+    """Stable presorted permutation (row ids) per sort key, for one catalog version."""
+
+    def __init__(self, df, sort_keys=SORT_KEYS):
+        self.n = len(df)
+        self.orders = {}
+        for name, (col, ascending) in sort_keys.items():
+            if col in df.columns:
+                order = df[col].sort_values(ascending=ascending, kind='stable', na_position='last')
+                self.orders[name] = order.index.to_numpy()
+        self.default = np.arange(self.n)
+
+        # 제품번호 → 행 번호 (좋아요 순 정렬용)
+        codes = df['code'].astype(str).tolist() if 'code' in df.columns else []
+        self.row_of_code = {code: i for i, code in enumerate(codes)}
+        # 행 번호 → Newest 순서에서의 위치 (좋아요 수 동점 정렬용)
+        newest = self.order('Newest')
+        self.newest_rank = np.empty(self.n, dtype=np.int64)
+        self.newest_rank[newest] = np.arange(len(newest))
+        self._liked_cache = LRUCache(max_entries=1)  # 좋아요 수가 바뀌면 이전 스냅샷은 필요 없음
+
+    def order(self, name):
+        return self.orders.get(name, self.default)
+
+    def sorted_ids(self, name, mask):
+        """Filtered row ids in the presorted order of `name`: one O(n) mask gather, no comparison sort."""
+        order = self.order(name)
+        return order[mask[order]]
+
+    def liked_order(self, like_counts):
+        """
+        Permutation for "most liked": liked rows by like count (desc, ties in Newest order),
+        then every other row in Newest order. Only the liked rows are sorted; the rest is one
+        O(n) gather of the Newest permutation. Cached per like-count snapshot.
+        """
+        def compute():
+            rows, counts = [], []
+            for code, count in like_counts.items():
+                row = self.row_of_code.get(str(code))
+                if row is not None and count > 0:
+                    rows.append(row)
+                    counts.append(count)
+            rows = np.asarray(rows, dtype=np.int64)
+            counts = np.asarray(counts, dtype=np.int64)
+            # 좋아요 수 내림차순, 같으면 Newest 순 (좋아요 받은 행만 정렬)
+            liked = rows[np.lexsort((self.newest_rank[rows], -counts))]
+
+            newest = self.order('Newest')
+            is_liked = np.zeros(self.n, dtype=bool)
+            is_liked[liked] = True
+            return np.concatenate([liked, newest[~is_liked[newest]]])
+
+        return self._liked_cache.get_or_compute(hash(frozenset(like_counts.items())), compute)
@@ -0,0 +1,138 @@
+"""
+catalog_query.py
+----------------
+필터 + 정렬 결과(행 번호 배열)를 프로세스 전체에서 공유하는 LRU 캐시.
+
+방문자 대부분이 같은 조합(필터 없음, 인기 브랜드 하나, 상위 카테고리 하나 ...)을
+보므로, (검색어, 브랜드, 상위/카테고리, 사이즈, 가격, 품절, 도착, 배, 정렬, 카탈로그 버전)
+정규화 튜플을 키로 조회 결과(QueryResult)를 저장해서 세션끼리 재사용.
+- 메모리 상한(QUERY_CACHE_BYTES)을 넘으면 오래 안 쓴 것부터 제거
+- 카탈로그 버전이 키에 들어가므로 새 버전이 오면 이전 결과는 자연히 밀려남
+- 위시리스트처럼 사용자마다 다른 조건은 캐시하지 않음
+- 검색 색인 빌드 전 단순 스캔 결과도 캐시하지 않음 (오타 허용 없음 → 색인이 준비되면 결과가 달라짐)
+
+QueryResult는 필터 마스크 + 전체 건수만 바로 계산하고, 정렬된 행 번호는
+미리 정렬된 순열을 앞에서부터 필요한 만큼만 훑어서 만든다 (지연 페이지네이션).
+1페이지는 순열 앞부분 몇 백 개만 보면 되고, 더 깊은 페이지를 요청할 때 이어서 확장.
+"""
+
+import threading
+
+import numpy as np
+
+from catalog_search import normalize_text
+from lru import LRUCache
+
+# 캐시가 쓸 수 있는 최대 메모리 (결과별 마스크 + 행 번호 배열 최대 크기 합계)
+QUERY_CACHE_BYTES = 64 * 1024 * 1024
+
+# 순열을 훑을 때 첫 구간 크기 (이후 두 배씩)
+_FIRST_SCAN = 512
+
+
+class QueryResult:
+    """
+    Filtered + sorted result of one query, materialized lazily.
+    total is known up front (mask count); ids(start, stop) scans the presorted order only
+    until `stop` matches are found and keeps that prefix for deeper pages / other sessions.
+    """
+
+    def __init__(self, key, order, mask):
+        self.key = key
+        self._order = order
+        self._mask = mask
+        self._mask.flags.writeable = False
+        self.total = int(np.count_nonzero(mask))
+        self._ids = np.zeros(0, dtype=np.int32)
+        self._scanned = 0
+        self._lock = threading.Lock()
+
+    @property
+    def nbytes(self):
+        """Upper bound of the memory this result can grow to (for the cache cap)."""
+        return self._mask.nbytes + self.total * 4
+
+    def ids(self, start=0, stop=None):
+        """Sorted row ids [start:stop] (read-only)."""
+        stop = self.total if stop is None else min(stop, self.total)
+        with self._lock:
+            step = max(_FIRST_SCAN, self._scanned)
+            while len(self._ids) < stop and self._scanned < len(self._order):
+                chunk = self._order[self._scanned:self._scanned + step]
+                self._ids = np.concatenate([self._ids, chunk[self._mask[chunk]].astype(np.int32)])
+                self._ids.flags.writeable = False
+                self._scanned += len(chunk)
+                step *= 2
+            return self._ids[start:stop]
+
+    def __len__(self):
+        return self.total
+
+
+# 프로세스 전체 공유 캐시 (Streamlit rerun 사이에도 모듈은 유지됨)
+_query_cache = LRUCache(max_bytes=QUERY_CACHE_BYTES, sizeof=lambda result: result.nbytes)
+
+
+def get_query_cache():
+    return _query_cache
+
+
+def _values_key(values):
+    return tuple(sorted(set(map(str, values or ()))))
+
+
+def query_key(catalog, search='', brands=None, upper=None, categories=None, sizes=None,
+              price_range=None, hide_sold_out=False, arrived_only=False, ship=None,
+              sort='Newest', like_counts=None):
+    """Normalized cache key; the catalog version makes old results unreachable after a refresh."""
+    return (
+        catalog.version,
+        ' '.join(normalize_text(search or '').split()),
+        _values_key(brands),
+        _values_key(upper),
+        _values_key(categories),
+        _values_key(sizes),
+        tuple(int(v) for v in price_range) if price_range is not None else None,
+        bool(hide_sold_out),
+        bool(arrived_only),
+        ship or None,
+        sort,
+        # 좋아요 순은 좋아요 수 스냅샷에 따라 달라짐
+        hash(frozenset(like_counts.items())) if sort == 'Most_Liked' and like_counts else None,
+    )
+
+
+def query_catalog(catalog, search='', search_mask=None, personal_mask=None,
+                  brands=None, upper=None, categories=None, sizes=None, price_range=None,
+                  hide_sold_out=False, arrived_only=False, ship=None, sort='Newest',
+                  like_counts=None, search_scanned=False):
+    """
+    QueryResult for the filters + sort, served from the process-wide cache when possible.
+    search_mask    : row mask of `search` (SearchIndex result; part of the key via `search`)
+    personal_mask  : per-user condition (wishlist) -> bypasses the cache
+    search_scanned : search_mask came from scan_mask (index still building) -> bypasses the cache,
+                     so the same key is not stuck with the scan result once the index is ready
+    """
+    filters = dict(brands=brands, upper=upper, categories=categories, sizes=sizes,
+                   price_range=price_range, hide_sold_out=hide_sold_out, arrived_only=arrived_only,
+                   ship=ship)
+    key = query_key(catalog, search=search, sort=sort, like_counts=like_counts, **filters)
+    cacheable = personal_mask is None and not search_scanned
+    if cacheable:
+        cached = _query_cache.get(key)
+        if cached is not None:
+            return cached
+
+    include_mask = search_mask
+    if personal_mask is not None:
+        include_mask = personal_mask if include_mask is None else (include_mask & personal_mask)
+
+    mask = catalog.facets.filter_mask(include_mask=include_mask, **filters)
+    if sort == 'Most_Liked':
+        order = catalog.sorts.liked_order(like_counts or {})
+    else:
+        order = catalog.sorts.order(sort)
+
+    if not cacheable:
+        return QueryResult(key + ('personal' if personal_mask is not None else 'scan',), order, mask)
+    return _query_cache.put(key, QueryResult(key, order, mask))
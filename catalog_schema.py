@@ -0,0 +1,93 @@
+"""
+catalog_schema.py
+-----------------
+정규화가 끝난 카탈로그 DataFrame에 타입 스키마를 적용.
+
+get_all_values()로 만든 DataFrame은 모든 컬럼이 object(파이썬 문자열)라서
+캐시 사본/세션마다 메모리를 크게 차지함. 값 종류가 적은 컬럼은 category,
+가격은 좁은 정수/실수 타입, 날짜는 파싱된 datetime 컬럼으로 둔다.
+"""
+
+import datetime
+
+import pandas as pd
+from dateutil import parser as date_parser
+
+# 값 종류가 적은 패싯 컬럼 → category
+CATEGORICAL_COLUMNS = ['brand', 'upper_category', 'category', 'size', 'condition', 'stock',
+                       'updated_at', 'arrival_date']
+
+# 원본 텍스트 컬럼에서 파생된 컬럼 (매 버전마다 다시 계산, 증분 병합 비교에서 제외)
+DERIVED_COLUMNS = ['updated_at_dt', 'arrival_dt']
+
+
+def _parse_updated_at(val):
+    """'%m/%d' first (as the Newest sort always did), then free-form."""
+    s = str(val).strip()
+    if not s:
+        return pd.NaT
+    try:
+        return datetime.datetime.strptime(s, '%m/%d')
+    except ValueError:
+        pass
+    try:
+        return date_parser.parse(s)
+    except (ValueError, OverflowError):
+        return pd.NaT
+
+
+def _parse_arrival(val):
+    """Same parser as ship_tracker_web._parse_arrivals ('TBD', '미정' -> NaT)."""
+    s = str(val).strip()
+    if not s or s.lower() in ('nan', 'none', 'nat'):
+        return pd.NaT
+    try:
+        return date_parser.parse(s)
+    except (ValueError, OverflowError):
+        return pd.NaT
+
+
+def _parse_dates(series, parse_one):
+    """Parse only the unique values, then map back (dates repeat a lot in the sheet)."""
+    codes, uniques = pd.factorize(series.astype(str))
+    parsed = pd.to_datetime(pd.Series([parse_one(u) for u in uniques], dtype=object), errors='coerce')
+    return pd.Series(parsed.to_numpy()[codes], index=series.index)
+
+
+def memory_bytes(df):
+    return int(df.memory_usage(deep=True).sum())
+
+
+def apply_catalog_schema(df):
+    """
+    Typed copy of the catalog:
+      - facets (brand, category, size, stock ...) -> category
+      - price -> int32, original_price -> nullable Float32
+      - updated_at / arrival_date -> parsed datetime columns (updated_at_dt, arrival_dt);
+        the raw text stays for display ('TBD', '미정', '12/05' ...)
+    Memory before/after is printed and kept in df.attrs.
+    """
+    if df is None or df.empty:
+        return df
+
+    before = memory_bytes(df)
+    df = df.drop(columns=[c for c in DERIVED_COLUMNS if c in df.columns])
+
+    if 'updated_at' in df.columns:
+        df['updated_at_dt'] = _parse_dates(df['updated_at'], _parse_updated_at)
+    if 'arrival_date' in df.columns:
+        df['arrival_dt'] = _parse_dates(df['arrival_date'], _parse_arrival)
+
+    for col in CATEGORICAL_COLUMNS:
+        if col in df.columns:
+            df[col] = df[col].astype(str).astype('category')
+
+    if 'price' in df.columns:
+        df['price'] = df['price'].astype('int32')
+    if 'original_price' in df.columns:
+        df['original_price'] = df['original_price'].astype('Float32')
+
+    after = memory_bytes(df)
+    df.attrs['memory_before'] = before
+    df.attrs['memory_after'] = after   # 디버그 모드 화면에 표시 (main.py)
+    return df
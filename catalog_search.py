@@ -0,0 +1,343 @@
+"""
+catalog_search.py
+-----------------
+카탈로그 검색용 n-gram 역색인 (카탈로그 버전당 한 번, Catalog 생성 시 빌드).
+
+- 상품명 / 브랜드 / 제품번호 / id / 제품설명 / 상위 카테고리 / 카테고리를 NFKC + casefold 로 정규화해서
+  한 줄 텍스트로 만들고, 문자 2-gram / 3-gram → 행 번호 배열(postings)로 색인
+- 띄어쓰기가 없는 태국어, 한글 음절도 문자 단위 n-gram이라 그대로 검색됨
+- 검색어는 공백으로 나눈 단어마다 (모두 포함 = AND):
+    2글자  → 2-gram postings 그대로
+    3글자+ → 3-gram postings 교집합 후 후보만 실제 부분문자열 확인
+    1글자  → 텍스트 직접 확인 (postings가 너무 커서 색인하지 않음)
+- 정확히 맞는 결과가 없으면 fuzzy_search (오타 허용):
+    단어 사전(브랜드/상품명 토큰)에 대한 SymSpell 방식 삭제 사전(FuzzyIndex)으로
+    가까운 단어를 찾아 그 단어로 다시 검색. 행마다 편집거리를 계산하지 않음.
+    검색어 전체가 브랜드 키워드와 가까우면 brand_normalizer 규칙으로 정규 브랜드에 연결
+- PrefixIndex: 자동완성용 정렬 배열 접두어 색인 (모든 브랜드 / 카테고리 / 상품명 단어, 등장 횟수 순).
+  배열을 브라우저로 보내서 입력 중 완성은 클라이언트에서 (search_box.py)
+"""
+
+import re
+import unicodedata
+from collections import Counter, defaultdict
+
+import numpy as np
+
+from brand_normalizer import BRAND_RULES, normalize_brand
+from lru import LRUCache
+
+# 카테고리도 포함 (자동완성 후보에 카테고리가 있으므로 고르면 결과가 나와야 함)
+SEARCH_FIELDS = ['name', 'brand', 'code', 'id', 'description', 'upper_category', 'category']
+
+# 검색 결과 캐시 크기 (검색어 수, 카탈로그 버전마다 새로 시작)
+SEARCH_CACHE_SIZE = 512
+
+# 오타 허용 사전에 넣는 단어를 뽑을 필드 (설명/코드는 제외)
+FUZZY_FIELDS = ['brand', 'name']
+
+# 오타 허용 최대 편집거리 (짧은 단어는 _max_distance로 더 줄임)
+MAX_EDIT_DISTANCE = 2
+
+# 필드 경계를 넘는 n-gram이 검색어와 맞지 않도록 구분 문자로 연결
+_FIELD_SEP = '\x00'
+
+
+
+def _mark_class():
+    """Regex class body of every BMP combining mark (Mn/Mc): Thai vowels / tone marks etc."""
+    ranges, start, prev = [], None, None
+    for cp in range(0x10000):
+        if unicodedata.category(chr(cp)) in ('Mn', 'Mc'):
+            if start is None:
+                start = cp
+            prev = cp
+        elif start is not None:
+            ranges.append(f'\\u{start:04x}-\\u{prev:04x}' if prev > start else f'\\u{start:04x}')
+            start = None
+    return ''.join(ranges)
+
+
+# 단어 글자 = 문자(숫자/_ 제외) + 결합 부호. \w에는 태국어 모음/성조 부호(Mn/Mc)가 빠져서
+# 'เสื้อยืด'가 'เส', 'อย' 조각으로 잘리므로 부호를 따로 포함
+_LETTER = rf'(?:[^\W\d_]|[{_mark_class()}])'
+_TOKEN_RE = re.compile(_LETTER + '{3,}')  # 숫자 없는 3글자 이상 단어
+_WORD_RE = re.compile(_LETTER + '{2,}')   # 자동완성용 (한글 두 글자 단어 포함)
+
+# 자동완성 후보 종류 (같은 건수면 브랜드 > 상위 카테고리 > 카테고리 > 상품명 단어 순)
+SUGGESTION_KINDS = ['brand', 'upper_category', 'category', 'word']
+
+
+def normalize_text(val):
+    """NFKC + casefold (full-width letters, Thai/Korean compatibility forms, case)."""
+    return unicodedata.normalize('NFKC', str(val)).casefold()
+
+
+def _ngrams(text, n):
+    return {text[i:i + n] for i in range(len(text) - n + 1)}
+
+
+# ──────────────────────────────────────────────────────
+# 오타 허용 (SymSpell 방식 삭제 사전)
+# ──────────────────────────────────────────────────────
+def _max_distance(term):
+    """Allowed edits by length: <3 chars none, 3-4 chars one, longer MAX_EDIT_DISTANCE."""
+    if len(term) < 3:
+        return 0
+    return 1 if len(term) <= 4 else MAX_EDIT_DISTANCE
+
+
+def _deletes(word, depth):
+    """The word plus every string reachable by deleting up to `depth` characters."""
+    out = {word}
+    frontier = {word}
+    for _ in range(depth):
+        frontier = {w[:i] + w[i + 1:] for w in frontier for i in range(len(w))}
+        out |= frontier
+    return out
+
+
+def edit_distance(a, b, limit):
+    """Optimal string alignment distance (adjacent swaps count as one), or limit+1 if larger."""
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    prev2 = None
+    prev = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        cur = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            cost = 0 if a[i - 1] == b[j - 1] else 1
+            cur[j] = min(prev[j] + 1, cur[j - 1] + 1, prev[j - 1] + cost)
+            if (prev2 is not None and i > 1 and j > 1
+                    and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]):
+                cur[j] = min(cur[j], prev2[j - 2] + 1)
+        if min(cur) > limit:
+            return limit + 1
+        prev2, prev = prev, cur
+    return prev[-1]
+
+
+class FuzzyIndex:
+    """
+    SymSpell-style deletion dictionary over a vocabulary.
+    Every word is stored under all of its deletions; a lookup generates the deletions
+    of the query term and checks the real edit distance only for the few words found.
+    """
+
+    def __init__(self, word_counts):
+        self.counts = dict(word_counts)
+        self.deletes = defaultdict(list)
+        for word in self.counts:
+            for d in _deletes(word, _max_distance(word)):
+                self.deletes[d].append(word)
+
+    def lookup(self, term):
+        """Closest vocabulary words as [(word, distance)], best distance only, most frequent first."""
+        limit = _max_distance(term)
+        if not limit:
+            return []
+        candidates = set()
+        for d in _deletes(term, limit):
+            candidates.update(self.deletes.get(d, ()))
+
+        scored = []
+        for word in candidates:
+            dist = edit_distance(term, word, limit)
+            if dist <= limit:
+                scored.append((word, dist))
+        if not scored:
+            return []
+        best = min(dist for _, dist in scored)
+        return sorted(((w, d) for w, d in scored if d == best), key=lambda wd: -self.counts[wd[0]])
+
+
+class SearchIndex:
+    """Character 2/3-gram inverted index over the searchable text of every row."""
+
+    def __init__(self, df, fields=SEARCH_FIELDS):
+        self.n = len(df)
+        cols = [df[c].astype(str).tolist() for c in fields if c in df.columns]
+        self.texts = [normalize_text(_FIELD_SEP.join(vals)) for vals in zip(*cols)] if cols else [''] * self.n
+
+        postings = {2: defaultdict(list), 3: defaultdict(list)}
+        for row, text in enumerate(self.texts):
+            for size, table in postings.items():
+                for gram in _ngrams(text, size):
+                    table[gram].append(row)
+        # 행 번호는 순서대로 추가되므로 이미 정렬 + 중복 없음
+        self.postings = {
+            size: {gram: np.asarray(rows, dtype=np.int32) for gram, rows in table.items()}
+            for size, table in postings.items()
+        }
+
+        # 오타 허용: 브랜드/상품명 단어 사전 (단어별 등장 행 수) + 브랜드 키워드 사전
+        vocab = Counter()
+        fuzzy_cols = [df[c].astype(str).tolist() for c in FUZZY_FIELDS if c in df.columns]
+        for vals in zip(*fuzzy_cols):
+            vocab.update(set(_TOKEN_RE.findall(normalize_text(' '.join(vals)))))
+        self.fuzzy = FuzzyIndex(vocab)
+
+        # 브랜드 키워드(규칙 테이블) + 카탈로그의 정규 브랜드명 → 정규 브랜드 → 행 번호
+        self.brand_rows = {}
+        if 'brand' in df.columns:
+            brands = df['brand'].astype(str).to_numpy()
+            for brand in set(brands):
+                self.brand_rows[brand] = np.flatnonzero(brands == brand).astype(np.int32)
+        phrases = Counter()
+        for canonical, keywords in BRAND_RULES:
+            for phrase in [canonical] + keywords:
+                phrases[normalize_text(phrase)] += len(self.brand_rows.get(canonical, ()))
+        for brand, rows in self.brand_rows.items():
+            phrases[normalize_text(brand)] += len(rows)
+        self.brand_phrases = FuzzyIndex(phrases)
+
+        self._cache = LRUCache(max_entries=SEARCH_CACHE_SIZE)
+        self._empty = np.zeros(0, dtype=np.int32)
+
+    def _term_ids(self, term):
+        if len(term) == 1:
+            return np.asarray([i for i, t in enumerate(self.texts) if term in t], dtype=np.int32)
+        if len(term) == 2:
+            return self.postings[2].get(term, self._empty)
+
+        lists = []
+        for gram in _ngrams(term, 3):
+            rows = self.postings[3].get(gram)
+            if rows is None:
+                return self._empty
+            lists.append(rows)
+        lists.sort(key=len)
+        ids = lists[0]
+        for rows in lists[1:]:
+            if not len(ids):
+                break
+            ids = np.intersect1d(ids, rows, assume_unique=True)
+        if len(term) == 3:
+            return ids
+        # 3-gram이 모두 있어도 연속이 아닐 수 있으므로 후보만 부분문자열 확인
+        texts = self.texts
+        return ids[[term in texts[i] for i in ids]] if len(ids) else ids
+
+    def search(self, query):
+        """Sorted row ids whose text contains every whitespace-separated term of the query."""
+        terms = [t for t in normalize_text(query).split() if t]
+        if not terms:
+            return np.arange(self.n)
+        key = tuple(sorted(set(terms)))
+
+        def compute():
+            ids = None
+            for term in sorted(key, key=len, reverse=True):  # 긴 단어일수록 후보가 적음
+                term_ids = self._term_ids(term)
+                ids = term_ids if ids is None else np.intersect1d(ids, term_ids, assume_unique=True)
+                if not len(ids):
+                    break
+            return ids
+
+        return self._cache.get_or_compute(key, compute)
+
+    def fuzzy_search(self, query):
+        """
+        Typo-tolerant search: (row ids, corrected query).
+        Terms with no exact hit are replaced by their closest vocabulary words
+        ("patagona" -> "patagonia", "islnd" -> "island"); if the whole query is close to
+        a brand keyword ("nort face", "ralph lauren"), rows of that canonical brand are added.
+        """
+        terms = [t for t in normalize_text(query).split() if t]
+        if not terms:
+            return np.arange(self.n), query
+
+        def compute():
+            ids = None
+            corrected = []
+            for term in terms:
+                term_ids = self._term_ids(term)
+                if not len(term_ids):
+                    matches = self.fuzzy.lookup(term)[:3]
+                    if matches:
+                        term_ids = np.unique(np.concatenate([self._term_ids(w) for w, _ in matches]))
+                        term = matches[0][0]
+                corrected.append(term)
+                ids = term_ids if ids is None else np.intersect1d(ids, term_ids, assume_unique=True)
+            corrected_query = ' '.join(corrected)
+
+            phrase = ' '.join(terms)
+            brand_match = [(phrase, 0)] if phrase in self.brand_phrases.counts else self.brand_phrases.lookup(phrase)
+            if brand_match:
+                canonical = normalize_brand(brand_match[0][0])
+                brand_ids = next((rows for b, rows in self.brand_rows.items()
+                                  if b.casefold() == canonical.casefold()), None)
+                if brand_ids is not None and len(brand_ids):
+                    ids = np.union1d(ids, brand_ids)
+                    corrected_query = canonical
+            return ids, corrected_query
+
+        return self._cache.get_or_compute(('~',) + tuple(terms), compute)
+
+    def to_mask(self, ids):
+        """Row ids -> boolean row mask (for FacetIndex include_mask)."""
+        mask = np.zeros(self.n, dtype=bool)
+        mask[ids] = True
+        return mask
+
+
+def scan_mask(df, query, fields=SEARCH_FIELDS):
+    """
+    Index-free fallback with the same matching rule as SearchIndex.search (every term is a
+    substring of some field), used while a cold-start catalog is still building its SearchIndex.
+    """
+    mask = np.ones(len(df), dtype=bool)
+    cols = [df[c].astype(str).map(normalize_text) for c in fields if c in df.columns]
+    for term in normalize_text(query).split():
+        hit = np.zeros(len(df), dtype=bool)
+        for col in cols:
+            hit |= col.str.contains(term, regex=False).to_numpy(dtype=bool)
+        mask &= hit
+    return mask
+
+
+# ──────────────────────────────────────────────────────
+# 자동완성 (정렬 배열 접두어 색인, 완성은 브라우저에서 - search_box.py)
+# ──────────────────────────────────────────────────────
+class PrefixIndex:
+    """
+    Autocomplete over every brand, category and product-name word, most frequent first.
+    Every word start of a suggestion ("the north face", "north face", "face") is a key in one
+    sorted array; the browser does the prefix lookup (binary search) on `payload`, so typing
+    never reruns the script.
+    """
+
+    def __init__(self, df):
+        entries = Counter()   # (kind, display text) -> row count
+        for kind in SUGGESTION_KINDS[:-1]:
+            if kind in df.columns:
+                for value, count in df[kind].astype(str).value_counts().items():
+                    if value.strip() and value not in ('Unknown', 'nan') and count > 0:
+                        entries[(kind, value)] += int(count)
+        if 'name' in df.columns:
+            words = Counter()
+            for name in df['name'].astype(str):
+                words.update(set(_WORD_RE.findall(normalize_text(name))))
+            named = {normalize_text(text) for _, text in entries}  # 브랜드/카테고리와 같은 단어는 중복 제외
+            for word, count in words.items():
+                if word not in named:
+                    entries[('word', word)] += count
+
+        # 건수 내림차순, 같으면 브랜드 > 상위 카테고리 > 카테고리 > 상품명 단어
+        # → 순위가 곧 항목 번호라서 브라우저는 번호가 작은 것부터 보여주면 됨
+        kind_rank = {k: i for i, k in enumerate(SUGGESTION_KINDS)}
+        ranked = sorted(entries.items(), key=lambda kv: (-kv[1], kind_rank[kv[0][0]]))
+        self.texts = list(dict.fromkeys(text for (_, text), _ in ranked))  # 같은 이름은 순위가 높은 쪽만
+
+        keys = []
+        for owner, text in enumerate(self.texts):
+            norm = normalize_text(text)
+            starts = [0] + [m.end() for m in re.finditer(r'\s+', norm)]
+            keys.extend((norm[start:], owner) for start in starts if start < len(norm))
+        # 브라우저의 문자열 비교(UTF-16 코드 단위) 순서로 정렬 → JS에서 그대로 이진 탐색
+        keys.sort(key=lambda k: (k[0].encode('utf-16-be'), k[1]))
+        self.payload = {
+            'texts': self.texts,
+            'keys': [k for k, _ in keys],
+            'owners': [owner for _, owner in keys],
+        }
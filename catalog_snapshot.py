@@ -0,0 +1,81 @@
+"""
+catalog_snapshot.py
+-------------------
+정규화가 끝난 카탈로그 DataFrame을 로컬 Parquet 파일 + 메타데이터(JSON)로 저장/복원.
+
+프로세스 재시작(runOnSave, 재배포) 직후 Google Sheets를 기다리지 않고
+디스크 스냅샷으로 첫 화면을 즉시 그리기 위한 용도.
+백그라운드 갱신이 성공할 때마다 스냅샷을 교체한다.
+"""
+
+import json
+import os
+import time
+
+import pandas as pd
+
+SNAPSHOT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache")
+SNAPSHOT_FILE = os.path.join(SNAPSHOT_DIR, "catalog.parquet")
+SNAPSHOT_META_FILE = os.path.join(SNAPSHOT_DIR, "catalog.meta.json")
+
+# 정규화 로직/컬럼 구성이 바뀌면 올려서 예전 스냅샷을 무시하게 함
+SNAPSHOT_FORMAT = 3
+
+
+def save_snapshot(df, extra_meta=None):
+    """
+    Persist the normalized catalog. Writes to temp files and renames them into
+    place, so a crash mid-write never leaves a half-written snapshot behind.
+    Returns True on success; failures are logged and ignored.
+    """
+    if df is None or df.empty:
+        return False
+    try:
+        os.makedirs(SNAPSHOT_DIR, exist_ok=True)
+        meta = {
+            "format": SNAPSHOT_FORMAT,
+            "saved_at": time.time(),
+            "rows": int(len(df)),
+            "columns": [str(c) for c in df.columns],
+            "attrs": {k: v for k, v in df.attrs.items() if isinstance(v, (str, int, float, bool))},
+        }
+        if extra_meta:
+            meta.update(extra_meta)
+
+        tmp_data = SNAPSHOT_FILE + ".tmp"
+        tmp_meta = SNAPSHOT_META_FILE + ".tmp"
+        df.to_parquet(tmp_data, index=False)
+        with open(tmp_meta, "w", encoding="utf-8") as f:
+            json.dump(meta, f, ensure_ascii=False)
+
+        # 데이터 먼저 교체 → 메타 교체. 메타가 유효성의 기준.
+        os.replace(tmp_data, SNAPSHOT_FILE)
+        os.replace(tmp_meta, SNAPSHOT_META_FILE)
+        return True
+    except Exception as e:
+        print(f"[Snapshot] Failed to save catalog snapshot: {e}")
+        return False
+
+
+def load_snapshot():
+    """
+    Load the last saved catalog.
+    Returns: (df, meta) or (None, None) if there is no usable snapshot.
+    """
+    try:
+        if not (os.path.exists(SNAPSHOT_FILE) and os.path.exists(SNAPSHOT_META_FILE)):
+            return None, None
+        with open(SNAPSHOT_META_FILE, "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        if meta.get("format") != SNAPSHOT_FORMAT:
+            return None, None
+
+        df = pd.read_parquet(SNAPSHOT_FILE)
+        if len(df) != meta.get("rows"):
+            # 데이터/메타 교체 사이에 종료된 경우
+            return None, None
+        df.attrs.update(meta.get("attrs", {}))
+        return df, meta
+    except Exception as e:
+        print(f"[Snapshot] Failed to load catalog snapshot: {e}")
+        return None, None
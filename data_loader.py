@@ -1,205 +1,551 @@
 import streamlit as st
 import pandas as pd
-import gspread
-from google.oauth2.service_account import Credentials
+import numpy as np
 import traceback
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from gspread.utils import rowcol_to_a1
+from brand_normalizer import normalize_brands
+from catalog import Catalog
+from catalog_schema import DERIVED_COLUMNS, apply_catalog_schema
+from catalog_snapshot import load_snapshot, save_snapshot
+from sheet_client import CATALOG_SPREADSHEET, get_modified_time, invalidate_handle, open_spreadsheet
 
 
 
-# Define the scope
-SCOPES = [
-    "https://www.googleapis.com/auth/spreadsheets",
-    "https://www.googleapis.com/auth/drive.readonly",
-    "https://www.googleapis.com/auth/drive.metadata.readonly",
-]
+# 카탈로그 백그라운드 갱신 주기 (초). 기존 cache_data(ttl=601)와 같은 주기.
+REFRESH_INTERVAL_SEC = 601
 
-@st.cache_data(ttl=601) # Changed to force re-run
-def load_data():
+# [NEW] 조건부 갱신: 시트의 Drive modifiedTime이 그대로면 전체 다운로드/정규화를 건너뜀
+CONDITIONAL_REFRESH = True
+
+# [NEW] 증분 병합: 시트가 바뀌었을 때 code별 행 해시를 비교해 바뀐 행만 다시 정규화
+INCREMENTAL_MERGE = True
+ROW_HASH_COL = '_row_hash'
+
+# 시트 헤더 → 앱 내부 컬럼명
+COLUMN_MAPPING = {
+    '제품번호': 'code',
+    't_id': 'code',
+    'cc': 'code',
+    '브랜드': 'brand',
+    '물품명': 'name',
+    '상위카테고리': 'upper_category', # Korean Header
+    'upper category': 'upper_category', # English Header Fallback
+    '카테고리': 'category',
+    'category': 'category',
+    '사이즈': 'size',
+    '컨디션': 'condition',
+    '판매가': 'price',
+    '출고가': 'original_price',   # T열: 원래 출고가 (할인율 계산용)
+    '제품설명': 'description',
+    '이미지': 'image_file_id',
+    '상태': 'stock',
+    '등록일': 'updated_at',
+    '도착예정일': 'arrival_date', 'eta': 'arrival_date', 'ETA': 'arrival_date',
+    '실측사이즈': 'measured_size'
+}
+
+# [NEW] 필요한 컬럼만, 행 구간(chunk)별로 나눠 병렬 조회 (get_all_values 대체)
+PROJECTED_READ = True
+READ_CHUNK_ROWS = 5000
+READ_WORKERS = 4
+# COLUMN_MAPPING 대상 외에 main.py가 원본 헤더(소문자) 그대로 읽는 컬럼
+EXTRA_USED_COLUMNS = {'id', 'product description', 'detail'}
+
+# [NEW] 표시용 파생 컬럼: 버전당 한 번 계산 → main.py는 필터/렌더링 때 읽기만 함
+DISPLAY_COLUMNS = ['stock_norm', 'is_out_of_stock', 'is_sold', 'has_arrival_info',
+                   'arrival_label', 'image_url', 'discount_pct']
+
+
+def _fetch_catalog(since=None, previous=None):
     """
     Connects to Google Sheets and loads the product data into a Pandas DataFrame.
+    Called from CatalogRefresher (possibly on its worker thread), so errors are raised, not drawn.
+
+    since: Drive modifiedTime of the catalog we already have. If the spreadsheet
+           has not been modified since then, returns None without downloading cells.
+           (찜목록/고객정보 탭도 같은 파일에 있어서 그쪽 쓰기도 '변경'으로 잡힘)
+    previous: the catalog currently served. When given, only new/edited rows are
+           re-normalized (see merge_catalog) and df.attrs['changes'] reports the diff.
     """
+    # [MODIFIED] 공용 리졸버(sheet_client.py) 사용
+    # 클라이언트는 프로세스당 1개, '상품목록' ID는 캐시 → 매번 list_spreadsheet_files() 하지 않음
+    modified_time = get_modified_time(CATALOG_SPREADSHEET)
+    if since and modified_time and modified_time == since:
+        return None
+
     try:
-        # Load credentials from secrets.toml
-        secrets = st.secrets["gcp_service_account"]
-        
-        # Create credentials object
-        creds = Credentials.from_service_account_info(
-            secrets, scopes=SCOPES
-        )
-        
-        # Authorize gspread
-        client = gspread.authorize(creds)
-        
-        # Open the specific sheet (Find by name, Open by ID)
-        # We list files to find the ID because names can be tricky
-        spreadsheets = client.list_spreadsheet_files()
-        
-        # [MODIFIED] Search for "상품목록" ONLY.
-        # We enforce "상품목록" usage.
-        target_sheet = next((s for s in spreadsheets if s['name'] == '상품목록'), None)
-        
-        if target_sheet:
-            sheet = client.open_by_key(target_sheet['id']).sheet1
-        else:
-            # If not found via list, try direct open
-            try:
-                sheet = client.open("상품목록").sheet1
-            except Exception as e:
-                st.error("Error: '상품목록' sheet not found. Please share the sheet with the service account.")
-                raise e
-            
-        # Get all values (list of lists) to handle headers manually
-        data = sheet.get_all_values()
-        
-        if not data:
-            return pd.DataFrame()
+        spreadsheet = open_spreadsheet(CATALOG_SPREADSHEET)
+        # Get values (list of lists) to handle headers manually
+        worksheet = spreadsheet.sheet1
+        data = _read_catalog_values(worksheet) if PROJECTED_READ else worksheet.get_all_values()
+    except Exception as e:
+        # 워커 스레드에서 실행되므로 st.error 대신 로그만 남기고 예외를 올림 (load_catalog에서 표시)
+        # 다음 시도에서 핸들을 다시 열도록 (ID가 바뀌었으면 재조회됨)
+        invalidate_handle(CATALOG_SPREADSHEET)
+        print("Error: '상품목록' sheet could not be read. Please share the sheet with the service account.")
+        raise e
+    
+    if not data:
+        return pd.DataFrame()
 
-        # Create DataFrame
-        # Assume first row is header
-        headers = data[0]
-        rows = data[1:]
+    df, changes = build_catalog_frame(data, previous)
         
-        df = pd.DataFrame(rows, columns=headers)
-        
-        column_mapping = {
-            '제품번호': 'code',
-            't_id': 'code',
-            'cc': 'code',
-            '브랜드': 'brand',
-            '물품명': 'name',
-            '상위카테고리': 'upper_category', # Korean Header
-            'upper category': 'upper_category', # English Header Fallback
-            '카테고리': 'category',
-            'category': 'category',
-            '사이즈': 'size',
-            '컨디션': 'condition',
-            '판매가': 'price',
-            '출고가': 'original_price',   # T열: 원래 출고가 (할인율 계산용)
-            '제품설명': 'description',
-            '이미지': 'image_file_id',
-            '상태': 'stock',
-            '등록일': 'updated_at',
-            '도착예정일': 'arrival_date', 'eta': 'arrival_date', 'ETA': 'arrival_date',
-            '실측사이즈': 'measured_size'
-        }
+    # Attach Metadata: Source Sheet Name
+    if modified_time:
+        df.attrs['modified_time'] = modified_time
+    df.attrs['source_sheet'] = spreadsheet.title
 
-        
-        # Normalize headers (strip whitespace)
-        df.columns = [str(c).strip() for c in df.columns]
-        
-        # Apply mapping
-        df.rename(columns=column_mapping, inplace=True)
-        
-        # [DEBUG] Print columns to console
-        print("DEBUG: Loaded Columns:", df.columns.tolist())
-        if 'upper_category' in df.columns:
-            print("DEBUG: Upper Category Sample:", df['upper_category'].unique()[:5])
+    if changes is not None:
+        df.attrs['changes'] = changes
+
+    return df
+
+
+def build_catalog_frame(data, previous=None):
+    """
+    Sheet values -> final catalog DataFrame (no I/O).
+    Returns: (df, changes) - changes is the merge_catalog report or None.
+    """
+    raw_df = _build_raw_frame(data)
+
+    # [NEW] 증분 병합: 이전 카탈로그가 있으면 새로 추가/수정된 행만 정규화
+    changes = None
+    if INCREMENTAL_MERGE and previous is not None and not previous.empty:
+        df, changes = merge_catalog(previous, raw_df)
+    else:
+        df = _normalize_rows(raw_df)
+
+    # [NEW] 타입 스키마 (category / int32 / Float32 / 파싱된 날짜) - 메모리 절감
+    df = apply_catalog_schema(df)
+    # [NEW] 표시용 파생 컬럼 (품절 여부, 도착 라벨, 이미지 URL, 할인율)
+    df = derive_display_columns(df)
+    return df, changes
+
+
+def _needed_column_indices(headers):
+    """0-based indices of the sheet columns the app actually uses (column A is always kept)."""
+    used = set(COLUMN_MAPPING.values()) | EXTRA_USED_COLUMNS
+    needed = []
+    for i, h in enumerate(headers):
+        h = str(h).strip()
+        if i == 0 or h in COLUMN_MAPPING or h.lower() in used:
+            needed.append(i)
+    return needed
+
+
+def _column_runs(indices):
+    """[0, 1, 2, 5, 6] -> [(0, 2), (5, 6)] : contiguous runs become one A1 range each."""
+    runs = []
+    for i in indices:
+        if runs and runs[-1][1] == i - 1:
+            runs[-1] = (runs[-1][0], i)
         else:
-            print("DEBUG: UPPER CATEGORY MISSING!")
-        
-        # Normalize headers to lowercase to avoid case sensitivity issues for mapped columns
-        df.columns = [str(c).lower().strip() for c in df.columns]
+            runs.append((i, i))
+    return runs
+
+
+def _read_catalog_values(worksheet):
+    """
+    Drop-in replacement for worksheet.get_all_values() that only downloads the
+    columns we use. The header row is read first, then the body is split into
+    READ_CHUNK_ROWS row ranges fetched concurrently with batch_get.
+    Returns header + rows (projected columns only), trailing empty rows removed.
+    """
+    headers = worksheet.row_values(1)
+    if not headers:
+        return []
+
+    needed = _needed_column_indices(headers)
+    runs = _column_runs(needed)
+    last_row = worksheet.row_count
+    spans = [
+        (r0, min(r0 + READ_CHUNK_ROWS - 1, last_row))
+        for r0 in range(2, last_row + 1, READ_CHUNK_ROWS)
+    ]
+
+    def fetch(span):
+        r0, r1 = span
+        ranges = [f"{rowcol_to_a1(r0, c0 + 1)}:{rowcol_to_a1(r1, c1 + 1)}" for c0, c1 in runs]
+        blocks = worksheet.batch_get(ranges)
+        n_rows = r1 - r0 + 1
+        rows = [[] for _ in range(n_rows)]
+        # API는 뒤쪽 빈 행/빈 셀을 생략해서 돌려주므로 get_all_values처럼 채워 넣음
+        for (c0, c1), block in zip(runs, blocks):
+            width = c1 - c0 + 1
+            for k in range(n_rows):
+                vals = list(block[k]) if k < len(block) else []
+                rows[k].extend(vals + [''] * (width - len(vals)))
+        return rows
+
+    if len(spans) <= 1:
+        chunks = [fetch(span) for span in spans]
+    else:
+        with ThreadPoolExecutor(max_workers=READ_WORKERS) as pool:
+            chunks = list(pool.map(fetch, spans))
+
+    rows = [row for chunk in chunks for row in chunk]
+    while rows and not any(rows[-1]):
+        rows.pop()
+
+    return [[headers[i] for i in needed]] + rows
+
+
+def _build_raw_frame(data):
+    """
+    Sheet values (list of lists, first row = header) -> DataFrame with mapped,
+    lowercased headers and a per-row hash of the raw cell values.
+    """
+    # Assume first row is header
+    headers = data[0]
+    rows = data[1:]
+    
+    df = pd.DataFrame(rows, columns=headers)
+    
+    # Normalize headers (strip whitespace)
+    df.columns = [str(c).strip() for c in df.columns]
+    
+    # Apply mapping
+    df.rename(columns=COLUMN_MAPPING, inplace=True)
+    
+    # [DEBUG] Print columns to console
+    print("DEBUG: Loaded Columns:", df.columns.tolist())
+    if 'upper_category' in df.columns:
+        print("DEBUG: Upper Category Sample:", df['upper_category'].unique()[:5])
+    else:
+        print("DEBUG: UPPER CATEGORY MISSING!")
+    
+    # Normalize headers to lowercase to avoid case sensitivity issues for mapped columns
+    df.columns = [str(c).lower().strip() for c in df.columns]
+    
+    # [Safety Net] Ensure 'code' column exists. If not, assume the first column is 'code'.
+    # [MODIFIED] main.py가 매 rerun마다 하던 "A열 = code" 강제 지정도 여기서 한 번만 처리
+    # (공유 카탈로그는 읽기 전용이라 세션에서 rename 하지 않음)
+    if not df.empty:
+        # 다른 열이 'code'로 매핑돼 있었다면 중복 컬럼이 되지 않도록 이름을 바꿔 둠
+        cols = ['code_alt' if c == 'code' else c for c in df.columns]
+        cols[0] = 'code'
+        df.columns = cols
+
+    # [NEW] 행 해시 (정규화 전 원본 값 기준) → 증분 병합에서 변경 감지용
+    df[ROW_HASH_COL] = pd.util.hash_pandas_object(df, index=False).to_numpy()
+
+    return df
+
+
+def _normalize_rows(df):
+    """
+    Brand normalization, image fallback and price coercion.
+    Works on any subset of rows, so the incremental merge can run it on changed rows only.
+    """
+    # [NEW] Brand Normalization
+    # 규칙 테이블/컴파일된 정규식은 brand_normalizer.py 참고 (고유값만 계산 후 일괄 매핑)
+    if 'brand' in df.columns:
+        df['brand'] = normalize_brands(df['brand'])
         
-        # [Safety Net] Ensure 'code' column exists. If not, assume the first column is 'code'.
-        if 'code' not in df.columns and not df.empty:
-            cols = list(df.columns)
-            cols[0] = 'code'
-            df.columns = cols
-
-        # [NEW] Brand Normalization
-        if 'brand' in df.columns:
-            def normalize_brand(val):
-                if not isinstance(val, str):
-                    return str(val)
-                s = val.strip().lower()
-                
-                # Specific mappings (Order matters: more specific first if needed, but here generic contains check works)
-                if 'polo' in s or 'ralph lauren' in s:
-                    return 'Polo'
-                if 'nike' in s or 'jordan' in s:
-                    return 'Nike'
-                if 'adidas' in s:
-                    return 'Adidas'
-                if 'new balance' in s or 'newbalance' in s:
-                    return 'New Balance'
-                if 'national geographic' in s or 'nationalgeographic' in s:
-                    return 'National Geographic'
-                if 'the north face' in s or 'north face' in s or 'thenorthface' in s:
-                    return 'The North Face'
-                if 'cp company' in s or 'c.p' in s:
-                     return 'C.P. Company'
-                if 'stone island' in s:
-                     return 'Stone Island'
-                if 'patagonia' in s:
-                    return 'Patagonia'
-                if 'lacoste' in s:
-                    return 'Lacoste'
-                if 'tommy' in s:
-                    return 'Tommy Hilfiger'
-                if 'marith' in s:
-                    return 'Marithe'
-                if 'burberry' in s:
-                    return 'Burberry'
-                if 'acmé' in s or 'acme' in s or 'adlv' in s:
-                    return 'ADLV (Acme de la Vie)'
-                
-                # Default: Title Case (e.g. "tommy hilfiger" -> "Tommy Hilfiger")
-                return val.strip().title()
-                
-            df['brand'] = df['brand'].apply(normalize_brand)
-            
-        # [MODIFIED] Image Fallback Logic
-        fallback_image_url = "https://drive.google.com/thumbnail?id=1Wk4sdliFYg8I8TvyDkUFWgemxXKq9fwB&sz=w1000"
-        # The user provided a view link: "https://drive.google.com/file/d/1Wk4sdliFYg8I8TvyDkUFWgemxXKq9fwB/view?usp=drive_link"
-        # Extracted ID: 1Wk4sdliFYg8I8TvyDkUFWgemxXKq9fwB
+    # [MODIFIED] Image Fallback Logic
+    fallback_image_url = "https://drive.google.com/thumbnail?id=1Wk4sdliFYg8I8TvyDkUFWgemxXKq9fwB&sz=w1000"
+    # The user provided a view link: "https://drive.google.com/file/d/1Wk4sdliFYg8I8TvyDkUFWgemxXKq9fwB/view?usp=drive_link"
+    # Extracted ID: 1Wk4sdliFYg8I8TvyDkUFWgemxXKq9fwB
+    
+    if 'image_file_id' in df.columns:
+        # Replace empty strings, NaN, or strict whitespace with Fallback ID/URL
+        # NOTE: get_image_url handles the ID extraction. We can just put the ID '1Wk4sdliFYg8I8TvyDkUFWgemxXKq9fwB'
+        # OR we can pre-fill it.
+        # Let's clean the column first.
+        df['image_file_id'] = df['image_file_id'].astype(str).str.strip()
         
-        if 'image_file_id' in df.columns:
-            # Replace empty strings, NaN, or strict whitespace with Fallback ID/URL
-            # NOTE: get_image_url handles the ID extraction. We can just put the ID '1Wk4sdliFYg8I8TvyDkUFWgemxXKq9fwB'
-            # OR we can pre-fill it.
-            # Let's clean the column first.
-            df['image_file_id'] = df['image_file_id'].astype(str).str.strip()
-            
-            # Identify "empty" values
-            empty_mask = (df['image_file_id'] == '') | (df['image_file_id'].str.lower() == 'nan') | (df['image_file_id'].str.lower() == 'none')
-            
-            # Assign fallback ID
-            df.loc[empty_mask, 'image_file_id'] = '1Wk4sdliFYg8I8TvyDkUFWgemxXKq9fwB'
+        # Identify "empty" values
+        empty_mask = (df['image_file_id'] == '') | (df['image_file_id'].str.lower() == 'nan') | (df['image_file_id'].str.lower() == 'none')
         
-        # Ensure price is numeric
-        if 'price' in df.columns:
-            # Handle cases where price might include currency symbols or commas
-            df['price'] = (
-                df['price']
-                .astype(str)
-                .str.replace(r'[^\d]', '', regex=True) # Keep only digits
-            )
-            df['price'] = pd.to_numeric(df['price'], errors='coerce').fillna(0).astype(int)
-
-        # 출고가도 numeric 변환. 빈 값은 NaN으로 유지 (할인율 미표기를 위해 fillna 안 씀)
-        if 'original_price' in df.columns:
-            df['original_price'] = (
-                df['original_price']
-                .astype(str)
-                .str.replace(r'[^\d]', '', regex=True)
-            )
-            df['original_price'] = pd.to_numeric(df['original_price'], errors='coerce')
-            # 0이면 의미 없으므로 NaN 처리
-            df.loc[df['original_price'] == 0, 'original_price'] = float('nan')
-
-            
-        # Attach Metadata: Source Sheet Name
-        if target_sheet:
-             df.attrs['source_sheet'] = target_sheet['name']
-        else:
-             df.attrs['source_sheet'] = "Unknown (Fallback)"
+        # Assign fallback ID
+        df.loc[empty_mask, 'image_file_id'] = '1Wk4sdliFYg8I8TvyDkUFWgemxXKq9fwB'
+    
+    # Ensure price is numeric
+    if 'price' in df.columns:
+        # Handle cases where price might include currency symbols or commas
+        df['price'] = (
+            df['price']
+            .astype(str)
+            .str.replace(r'[^\d]', '', regex=True) # Keep only digits
+        )
+        df['price'] = pd.to_numeric(df['price'], errors='coerce').fillna(0).astype(int)
+
+    # 출고가도 numeric 변환. 빈 값은 NaN으로 유지 (할인율 미표기를 위해 fillna 안 씀)
+    if 'original_price' in df.columns:
+        df['original_price'] = (
+            df['original_price']
+            .astype(str)
+            .str.replace(r'[^\d]', '', regex=True)
+        )
+        df['original_price'] = pd.to_numeric(df['original_price'], errors='coerce')
+        # 0이면 의미 없으므로 NaN 처리
+        df.loc[df['original_price'] == 0, 'original_price'] = float('nan')
+    return df
+
 
+def merge_catalog(previous, raw_df):
+    """
+    Row-level incremental merge keyed by `code`.
+    Rows whose raw hash is unchanged are reused from `previous` as-is; only new or
+    edited rows go through _normalize_rows. The result is a new DataFrame in sheet
+    order (swapped in atomically by the refresher), never a partially patched one.
+
+    Returns: (df, changes)
+        changes = {'added': [codes], 'changed': [codes], 'removed': [codes]}
+        or None when a full rebuild was needed (header change, duplicate codes ...)
+    """
+    # 스키마 단계에서 붙는 파생 컬럼은 비교/재사용 대상이 아님 (병합 후 다시 계산됨)
+    previous = previous[[c for c in previous.columns
+                         if c not in DERIVED_COLUMNS and c not in DISPLAY_COLUMNS]]
+    if (
+        ROW_HASH_COL not in previous.columns
+        or list(previous.columns) != list(raw_df.columns)
+        or 'code' not in raw_df.columns
+        or not raw_df['code'].is_unique
+        or not previous['code'].is_unique
+    ):
+        return _normalize_rows(raw_df), None
+
+    # 새 시트의 각 행이 이전 카탈로그의 몇 번째 행인지 (-1 = 신규)
+    pos = pd.Index(previous['code']).get_indexer(raw_df['code'])
+    known = pos >= 0
+    same = np.zeros(len(raw_df), dtype=bool)
+    same[known] = (
+        previous[ROW_HASH_COL].to_numpy()[pos[known]] == raw_df[ROW_HASH_COL].to_numpy()[known]
+    )
+
+    reused = previous.iloc[pos[same]]
+    reused.index = np.flatnonzero(same)
+    dirty = raw_df[~same]
+    if dirty.empty:
+        df = reused.reset_index(drop=True)
+    else:
+        normalized = _normalize_rows(dirty.copy())
+        normalized.index = np.flatnonzero(~same)
+        df = pd.concat([reused, normalized]).sort_index().reset_index(drop=True)
+
+    removed_mask = ~previous['code'].isin(raw_df['code'])
+    changes = {
+        'added': raw_df.loc[~known, 'code'].astype(str).tolist(),
+        'changed': raw_df.loc[known & ~same, 'code'].astype(str).tolist(),
+        'removed': previous.loc[removed_mask, 'code'].astype(str).tolist(),
+    }
+    return df, changes
+
+
+def _map_unique(series, fn, dtype=object):
+    """Apply fn to the unique values only and map the results back (vectorized take)."""
+    codes, uniques = pd.factorize(series, use_na_sentinel=False)
+    return np.asarray([fn(u) for u in uniques], dtype=dtype)[codes]
+
+
+def _arrival_label(val):
+    """Raw ETA text -> '' (no ETA) / 'TBD' ('TBD', '미정') / the stripped text."""
+    s = str(val).strip()
+    if s.lower() in ('', 'nan', 'nat', 'none'):
+        return ''
+    if s.upper() == 'TBD' or s == '미정':
+        return 'TBD'
+    return s
+
+
+def derive_display_columns(df):
+    """
+    Materialize what the catalog page used to recompute on every rerun for every row:
+      stock_norm / is_out_of_stock (filter) / is_sold (card overlay),
+      has_arrival_info / arrival_label, image_url, discount_pct (NA = no discount).
+    The Newest sort reads updated_at_dt from the schema stage.
+    """
+    if df is None or df.empty:
         return df
+    n = len(df)
 
+    stock = df['stock'] if 'stock' in df.columns else pd.Series([''] * n, index=df.index)
+    stock_norm = _map_unique(stock, lambda v: str(v).lower().strip())
+    df['stock_norm'] = pd.Categorical(stock_norm)
+    df['is_out_of_stock'] = _map_unique(stock, lambda v: 'out of stock' in str(v).lower().strip(), bool)
+    df['is_sold'] = _map_unique(
+        stock, lambda v: 'out of stock' in str(v).lower().strip() or 'sold' in str(v).lower().strip(), bool
+    )
+
+    arrival = df['arrival_date'] if 'arrival_date' in df.columns else pd.Series([''] * n, index=df.index)
+    arrival_label = _map_unique(arrival, _arrival_label)
+    df['arrival_label'] = pd.Categorical(arrival_label)
+    df['has_arrival_info'] = arrival_label != ''
+
+    if 'image_file_id' in df.columns:
+        df['image_url'] = _map_unique(df['image_file_id'], lambda v: get_image_url(v) or '')
+    else:
+        df['image_url'] = ''
+
+    # 할인율: 출고가가 있고 판매가보다 클 때만 (기존 카드 계산과 동일하게 반올림)
+    if 'original_price' in df.columns and 'price' in df.columns:
+        price = df['price'].to_numpy(dtype='float64')
+        orig = df['original_price'].to_numpy(dtype='float64', na_value=np.nan)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            has_discount = (orig > 0) & (orig > price)
+            pct = np.round((1 - price / orig) * 100)
+        df['discount_pct'] = pd.Series(np.where(has_discount, pct, np.nan), index=df.index).astype('Int16')
+    else:
+        df['discount_pct'] = pd.Series([pd.NA] * n, index=df.index, dtype='Int16')
+
+    return df
+
+
+class CatalogRefresher:
+    """
+    Stale-while-revalidate holder for the '상품목록' catalog.
+
+    - On a cold start the on-disk snapshot (catalog_snapshot.py) is served right away
+      and revalidated in the background. Only without a snapshot does get() block once.
+    - After that a daemon worker re-fetches every `interval` seconds and swaps a new
+      Catalog (catalog.py) in with a single reference assignment, so readers always see
+      either the old or the new version, never a half-built one.
+    - If a refresh fails, the last good catalog keeps being served.
+    - The cold-start Catalog (snapshot or first fetch) only has the cheap filter/sort
+      indexes; the worker builds its search/similar indexes before the first revalidation.
+      Refreshed catalogs are fully built on the worker before they are swapped in.
+    - A sheet change that touched no catalog rows (likes / registrations live in the same
+      file) keeps the current Catalog, so no index is rebuilt.
+    """
+
+    def __init__(self, fetch_fn, interval=REFRESH_INTERVAL_SEC, use_snapshot=True,
+                 conditional=CONDITIONAL_REFRESH):
+        self._fetch_fn = fetch_fn
+        self._interval = interval
+        self._use_snapshot = use_snapshot
+        self._conditional = conditional
+        self._from_snapshot = False   # 현재 데이터가 디스크 스냅샷인지 (즉시 재검증 필요)
+        self._fetch_lock = threading.Lock()   # 동시에 하나의 fetch만 실행
+        self._worker = None
+        self._worker_lock = threading.Lock()  # 세션 여러 개가 동시에 get()해도 워커는 하나만
+        self._catalog = None
+        self.loaded_at = None    # 마지막 성공 시각 (epoch seconds)
+        self.checked_at = None   # 마지막 변경 확인 시각 (변경 없음 포함)
+        self.last_error = None   # 마지막 갱신 실패 예외 (성공 시 None)
+        self.last_changes = None # 마지막 증분 병합 결과 {'added', 'changed', 'removed'}
+
+    @property
+    def _df(self):
+        return self._catalog.df if self._catalog is not None else None
+
+    def get(self):
+        """Return the current shared Catalog. Only the cold start waits on Google Sheets."""
+        if self._df is None:
+            with self._fetch_lock:
+                # 다른 세션이 먼저 로드했을 수 있으므로 다시 확인
+                if self._df is None and self._use_snapshot:
+                    snap_df, snap_meta = load_snapshot()
+                    if snap_df is not None:
+                        # 검색/비슷한 상품 인덱스는 워커에서 (여기서 빌드하면 모든 세션이 대기)
+                        self._catalog = Catalog(snap_df, text_indexes=False)
+                        self.loaded_at = snap_meta.get('saved_at')
+                        self._from_snapshot = True
+                if self._df is None:
+                    df = self._fetch_fn()
+                    self._swap(df, text_indexes=False)
+                    if self._use_snapshot:
+                        save_snapshot(df)
+        self._ensure_worker()
+        return self._catalog
+
+    def refresh(self):
+        """Fetch the next version and swap it in. Keeps serving the old one on failure."""
+        try:
+            since = None
+            if self._conditional and self._df is not None:
+                since = self._df.attrs.get('modified_time')
+            with self._fetch_lock:
+                df = self._fetch_fn(since=since, previous=self._df)
+            self.checked_at = time.time()
+            if df is None:
+                # 시트 변경 없음 → 현재 데이터(스냅샷 포함)가 최신
+                self._from_snapshot = False
+                self.last_error = None
+                return True
+            changes = df.attrs.pop('changes', None)
+            if self._same_rows(df, changes):
+                # 찜목록/고객정보 탭 쓰기 등 상품 행은 그대로 → 현재 Catalog 유지 (버전/인덱스/캐시 그대로)
+                self._df.attrs['modified_time'] = df.attrs.get('modified_time')
+                self._from_snapshot = False
+                self.last_error = None
+                return True
+            if changes is not None:
+                self.last_changes = changes
+                print(
+                    f"[CatalogRefresher] Incremental merge: +{len(changes['added'])} added, "
+                    f"~{len(changes['changed'])} changed, -{len(changes['removed'])} removed"
+                )
+            self._swap(df)
+            if self._use_snapshot:
+                save_snapshot(df)
+            return True
+        except Exception as e:
+            self.last_error = e
+            print(f"[CatalogRefresher] Refresh failed, serving previous catalog: {e}")
+            return False
+
+    def _same_rows(self, df, changes):
+        """True when an incremental merge found no added/changed/removed rows and the order is unchanged."""
+        current = self._df
+        if changes is None or current is None or any(changes.values()):
+            return False
+        if list(df.columns) != list(current.columns) or len(df) != len(current):
+            return False
+        return 'code' in df.columns and (df['code'].astype(str).to_numpy() == current['code'].astype(str).to_numpy()).all()
+
+    def _swap(self, df, text_indexes=True):
+        self._catalog = Catalog(df, text_indexes=text_indexes)
+        self.loaded_at = time.time()
+        self.checked_at = self.loaded_at
+        self.last_error = None
+        self._from_snapshot = False
+
+    def _ensure_worker(self):
+        if self._worker is not None and self._worker.is_alive():
+            return
+        with self._worker_lock:
+            if self._worker is not None and self._worker.is_alive():
+                return
+            self._worker = threading.Thread(target=self._run, name="catalog-refresher", daemon=True)
+            self._worker.start()
+
+    def _run(self):
+        # 콜드 스타트 카탈로그의 검색/비슷한 상품 인덱스 (세션은 그동안 단순 검색으로 동작)
+        if self._catalog is not None:
+            try:
+                self._catalog.build_text_indexes()
+            except Exception as e:
+                print(f"[CatalogRefresher] Text index build failed: {e}")
+        # 스냅샷으로 시작했다면 주기를 기다리지 않고 바로 최신 시트로 교체
+        if self._from_snapshot:
+            self.refresh()
+        while True:
+            time.sleep(self._interval)
+            self.refresh()
+
+
+@st.cache_resource
+def get_catalog_refresher():
+    """Process-wide refresher shared by every session."""
+    return CatalogRefresher(_fetch_catalog)
+
+
+def load_catalog():
+    """
+    Returns the current shared, read-only Catalog (see catalog.py).
+    Served from the background refresher; never waits on Google Sheets once warm.
+    """
+    try:
+        return get_catalog_refresher().get()
     except Exception as e:
         st.error(f"데이터를 불러오는 중 오류가 발생했습니다: {e}")
         st.code(traceback.format_exc()) # Print full traceback
-        return pd.DataFrame()
+        return Catalog(pd.DataFrame())
+
 
 def get_image_url(file_id):
     """
@@ -1,8 +1,12 @@
 import streamlit as st
-import pandas as pd
 import streamlit as st
-import pandas as pd
-from data_loader import load_data, get_image_url
+from data_loader import load_catalog
+from catalog_query import get_query_cache, query_catalog
+from catalog_search import scan_mask
+import brand_bar
+import card_grid
+import search_box
+import html
 from auth_manager import AuthManager
 import base64
 import os
@@ -146,21 +150,11 @@ st.markdown("""
 # --- Load Data ---
 # --- Load Data ---
 with st.spinner('상품 정보를 불러오는 중입니다...'):
-    df = load_data()
-    
-    # [Fix] Ensure the first column is treated as 'code' if explicit column missing
-    if not df.empty:
-        # Check if 'code' exists
-        has_code = 'code' in [c.lower() for c in df.columns]
-        
-        # If 'code' not found or we want to force Column A as code (User requirement)
-        # We will strictly alias the first column to 'code' for the app's logic
-        cols = list(df.columns)
-        if cols:
-            # Keep original name as reference but copy data to 'code' or rename default
-            # Renaming is safer to avoid duplication confusion
-            # Case: The first column IS the code column.
-            df.rename(columns={cols[0]: 'code'}, inplace=True)
+    # [MODIFIED] 프로세스 공유 카탈로그 (catalog.py) - 세션마다 복사하지 않음
+    catalog = load_catalog()
+    # 읽기 전용 DataFrame: 필터/정렬은 행 번호(row id) 배열로만 처리하고 절대 수정하지 않음
+    # ([Fix] A열 = 'code' 강제 지정은 data_loader에서 버전당 한 번 처리됨)
+    df = catalog.df
 
 
 # --- Localization ---
@@ -172,7 +166,8 @@ lang_dict = {
         'title': "ร้านเสื้อผ้าวินเทจคัดเกรด (822 Shop)",
         'filter': "ตัวกรอง (Filter)", # Removed icon
         'search': "Search",
-        'search_placeholder': "Ex : Code or Name",
+        'search_placeholder': "Ex : Code, Name or Brand",
+        'search_fuzzy': "แสดงผลลัพธ์สำหรับ “{query}”",
         'brand': "แบรนด์",
         'upper_category': "หมวดหมู่หลัก (Upper Category)", # [NEW]
         'category': "หมวดหมู่",
@@ -180,8 +175,11 @@ lang_dict = {
         'price_range': "ช่วงราคา (บาท)",
         'show_sold_out': "แสดงสินค้าที่หมดแล้ว",
         'sort': "เรียงตาม",
-        'sort_options': ["ล่าสุด (Newest)", "ราคา: ต่ำไปสูง (Low-High)", "ราคา: สูงไปต่ำ (High-Low)", "ชื่อ (Name)"],
+        'sort_options': ["ล่าสุด (Newest)", "ราคา: ต่ำไปสูง (Low-High)", "ราคา: สูงไปต่ำ (High-Low)", "ชื่อ (Name)",
+                         "ส่วนลดมากที่สุด (Discount)", "ถูกใจมากที่สุด (Most Liked)"],
         'total_items': "แสดง {current} จาก {total} รายการ",
+        'load_more_mode': "เลื่อนดูต่อเนื่อง (Load more)",
+        'load_more': "ดูเพิ่มเติม ({shown}/{total})",
         'total_simple': "ทั้งหมด {total} รายการ", # New simple count
         'page': "หน้า",
         'page_caption': "หน้า {current} จาก {total}",
@@ -190,10 +188,13 @@ lang_dict = {
         'no_image': "📷 ไม่มีรูปภาพ",
         'detail_btn': "ดูรายละเอียด & สั่งซื้อ",
         'desc_title': "**รายละเอียดสินค้า**",
+        'similar_items': "**สินค้าที่คุณอาจชอบ**",
         'date_title': "📅 วันที่ลงขาย",
         'arrival_title': "วันที่คาดว่าจะมาถึง",
         'arrival_tbd': "ยังไม่กำหนด",
         'show_arrived_only': "แสดงเฉพาะสินค้าพร้อมส่ง",
+        'ship_filter': "สินค้าบนเรือลำนี้",
+        'ship_all': "ทั้งหมด",
         'line_btn': "🟢 ติดต่อซื้อทาง Line (คลิก)",
         'login_tab': "เข้าสู่ระบบ", 'register_tab': "สมัครสมาชิก",
         'username': "ไอดี (ID)", 'password': "รหัสผ่าน", 'confirm_password': "ยืนยันรหัสผ่าน",
@@ -209,7 +210,8 @@ lang_dict = {
         'title': "Curated Vintage Clothing Shop",
         'filter': "Filter", # Removed icon
         'search': "Search",
-        'search_placeholder': "Ex : Code or Name",
+        'search_placeholder': "Ex : Code, Name or Brand",
+        'search_fuzzy': "Showing results for “{query}”",
         'brand': "Brand",
         'upper_category': "Upper Category", # [NEW]
         'category': "Category",
@@ -217,8 +219,11 @@ lang_dict = {
         'price_range': "Price Range (THB)",
         'show_sold_out': "Show Sold Out Items",
         'sort': "Sort By",
-        'sort_options': ["Newest", "Price: Low to High", "Price: High to Low", "Name"],
+        'sort_options': ["Newest", "Price: Low to High", "Price: High to Low", "Name",
+                         "Biggest Discount", "Most Liked"],
         'total_items': "Showing {current} of {total} items",
+        'load_more_mode': "Continuous scroll (Load more)",
+        'load_more': "Load more ({shown}/{total})",
         'total_simple': "Total {total} items", # New simple count
         'page': "Page",
         'page_caption': "Page {current} of {total}",
@@ -227,10 +232,13 @@ lang_dict = {
         'no_image': "📷 No Image",
         'detail_btn': "Details & Buy",
         'desc_title': "**Description**",
+        'similar_items': "**You may also like**",
         'date_title': "📅 Date Added",
         'arrival_title': "ETA",
         'arrival_tbd': "TBD",
         'show_arrived_only': "Show Arrived Items Only",
+        'ship_filter': "Items on this ship",
+        'ship_all': "All",
         'line_btn': "🟢 Buy via Line",
         'login_tab': "Login", 'register_tab': "Sign Up",
         'username': "Username", 'password': "Password", 'confirm_password': "Confirm Password",
@@ -246,7 +254,8 @@ lang_dict = {
         'title': "엄선된 구제 의류를 만나보세요.",
         'filter': "필터", # Removed icon
         'search': "검색",
-        'search_placeholder': "예 : Code or Name",
+        'search_placeholder': "예 : 제품번호, 상품명, 브랜드",
+        'search_fuzzy': "“{query}” 검색 결과를 보여드려요",
         'brand': "브랜드",
         'upper_category': "상위 카테고리", # [NEW]
         'category': "카테고리",
@@ -254,8 +263,10 @@ lang_dict = {
         'price_range': "가격 범위 (KRW)",
         'show_sold_out': "품절된 상품도 보기 (Out of Stock)",
         'sort': "정렬 기준",
-        'sort_options': ["최신순", "가격 낮은순", "가격 높은순", "이름순"],
+        'sort_options': ["최신순", "가격 낮은순", "가격 높은순", "이름순", "할인율 높은순", "좋아요 많은순"],
         'total_items': "총 {total}개의 상품 중 {current}개를 보여줍니다.",
+        'load_more_mode': "계속 스크롤해서 보기 (더 보기)",
+        'load_more': "더 보기 ({shown}/{total})",
         'total_simple': "총 {total}개 상품", # New simple count
         'page': "📄 페이지 이동",
         'page_caption': "총 {total} 페이지 중 {current} 페이지",
@@ -264,10 +275,13 @@ lang_dict = {
         'no_image': "📷 이미지 없음",
         'detail_btn': "상세 정보 및 구매 (Buy Now)",
         'desc_title': "**제품 설명**",
+        'similar_items': "**이런 상품은 어때요?**",
         'date_title': "📅 등록일",
         'arrival_title': "도착예정일",
         'arrival_tbd': "미정",
         'show_arrived_only': "도착한 상품만 보기",
+        'ship_filter': "이 배로 오는 상품",
+        'ship_all': "전체",
         'line_btn': "🟢 라인으로 구매 문의 (Line Contact)",
         'login_tab': "로그인", 'register_tab': "회원가입",
         'username': "아이디", 'password': "비밀번호", 'confirm_password': "비밀번호 확인",
@@ -281,6 +295,9 @@ lang_dict = {
     }
 }
 
+# [NEW] sort_options 순서와 같은 정렬 이름 (catalog_index.SORT_KEYS / 좋아요 순)
+SORT_NAMES = ["Newest", "Price_Low", "Price_High", "Name", "Discount", "Most_Liked"]
+
 # Language Toggle (Sidebar Top)
 st.sidebar.markdown("### Language") # Removed globe icon
 lang_code = st.sidebar.radio("Language", ('TH', 'EN', 'KR'), horizontal=True, label_visibility="collapsed")
@@ -410,18 +427,15 @@ if st.session_state.get('sidebar_page', 'catalog') == 'about':
     from ship_tracker_web import get_ship_tracker_html
     import streamlit.components.v1 as components
 
-    # ── 도착 예정일 데이터: arrival_date 컬럼에서 추출 ──
-    _arrival_col = 'arrival_date'
-    if _arrival_col in df.columns:
-        _raw_arrivals = df[_arrival_col].dropna().astype(str).tolist()
-        _arrivals = [v for v in _raw_arrivals if v.strip() and v.lower() not in ('nan', 'none', 'nat', '')]
-    else:
-        _arrivals = []
+    # ── 도착 예정일 데이터: 카탈로그 버전마다 만든 배(도착 예정일)별 묶음에서 읽음 ──
+    # [MODIFIED] 행마다 문자열 목록을 만들어 파싱하지 않고 catalog_index.CohortIndex 사용
+    _arrivals = catalog.cohorts.arrival_dates()
 
-    # ── 선박 트래커: 현재 언어(lang_code) 전달 ──
-    # [방어 코드] ship_tracker_web.py 구버전(lang 파라미터 없음) 배포 시에도 크래시 없이 동작
+    # ── 선박 트래커: 현재 언어(lang_code) + 배마다 상품 수 전달 ──
+    # [방어 코드] ship_tracker_web.py 구버전(lang / counts 파라미터 없음) 배포 시에도 크래시 없이 동작
     try:
-        _tracker_html = get_ship_tracker_html(arrival_dates=_arrivals, lang=lang_code)
+        _tracker_html = get_ship_tracker_html(arrival_dates=_arrivals, lang=lang_code,
+                                              counts=catalog.cohorts.counts)
     except TypeError:
         _tracker_html = get_ship_tracker_html(arrival_dates=_arrivals)
     components.html(_tracker_html, height=290, scrolling=False)
@@ -663,9 +677,9 @@ try:
         # Clear param to prevent loop
         if 'toggle_like' in st.query_params:
             del st.query_params['toggle_like']
-            
-        # Rerun to refresh state
-        st.rerun()
+
+        # [MODIFIED] st.rerun() 제거 - 좋아요 반영 후 이 실행을 그대로 이어감
+        #            (아래에서 좋아요 목록을 읽으므로 화면은 이미 최신 → 전체 재실행 한 번 절약)
 except Exception as e:
     # Fallback or older streamlit version handling could go here
     pass
@@ -711,46 +725,107 @@ if st.session_state['user']:
 
 
 # 1. Search
-search_query = st.sidebar.text_input(T['search'], placeholder=T['search_placeholder'])
+# [MODIFIED] 자동완성 검색창 (search_box.py): 카탈로그 접두어 색인(catalog_search.PrefixIndex) 전체를
+#            브라우저로 넘기고 입력 중 완성은 브라우저에서 → 키 입력마다 rerun 없음.
+#            모든 브랜드/카테고리/상품명 단어가 후보, 목록에 없는 검색어도 입력 가능
+#            (콜드 스타트 직후 색인 빌드 중에는 추천어 없이 입력만)
+def reset_page():
+    st.session_state.page = 1  # 검색어가 바뀌면 1페이지부터
+
+
+with st.sidebar:
+    search_query = search_box.render_search_box(
+        catalog.autocomplete, T['search'], T['search_placeholder'], key='flt_search', on_change=reset_page)
+
+# [MODIFIED] 영어 제한 제거 - 한국어/태국어 검색어도 n-gram 색인으로 검색 (catalog_search.SearchIndex)
+
+# [MODIFIED] 위시리스트 / 검색 마스크를 사이드바에서 미리 계산 → 패싯 건수와 카탈로그 필터가 같이 사용
+wish_mask = None
+if st.session_state['user'] and show_my_wishlist and 'code' in df.columns:
+    my_likes_ids = am.get_user_likes(st.session_state['user']['user_id'])
+    wish_mask = df['code'].astype(str).isin(my_likes_ids).to_numpy()
+
+# Filter: Search (Name / Brand / Code / Description) - 전체 스캔 대신 색인 조회
+# [NEW] 정확히 맞는 상품이 없으면 오타 허용 검색으로 재시도 ("patagona" → Patagonia)
+search_mask = None
+search_scanned = False
+if search_query.strip() and catalog.search is None:
+    # 검색 색인 빌드 중 (콜드 스타트 직후 몇 초) → 같은 규칙의 단순 스캔 (조회 결과 캐시에는 안 넣음)
+    search_mask = scan_mask(df, search_query)
+    search_scanned = True
+elif search_query.strip():
+    search_ids = catalog.search.search(search_query)
+    if not len(search_ids):
+        search_ids, corrected_query = catalog.search.fuzzy_search(search_query)
+        if len(search_ids):
+            st.sidebar.caption(T['search_fuzzy'].format(query=corrected_query))
+    search_mask = catalog.search.to_mask(search_ids)
+
+extra_mask = wish_mask
+if search_mask is not None:
+    extra_mask = search_mask if extra_mask is None else (extra_mask & search_mask)
+
+
+def combine_brand_selection(sidebar_brands, bar_brands):
+    """브랜드 바 선택값을 사이드바 브랜드 필터에 반영 (바 선택이 있으면 교집합, 비면 바 선택)."""
+    if bar_brands and not sidebar_brands:
+        return list(bar_brands)
+    if bar_brands and sidebar_brands:
+        return list(set(sidebar_brands) & set(bar_brands)) or list(bar_brands)
+    return list(sidebar_brands or [])
+
+
+# [NEW] 패싯 건수 ("Nike (42)") - 현재 선택된 다른 조건 기준, 조건 조합마다 캐시 (catalog_index.FacetIndex)
+# 아래 위젯들은 key로 session_state에 값을 남기므로, 지난 선택값으로 모든 패싯 건수를 한 번에 계산
+facet_filters = dict(
+    brands=combine_brand_selection(st.session_state.get('flt_brand'),
+                                   st.session_state.get('selected_brands_bar')),
+    upper=st.session_state.get('flt_upper'),
+    categories=st.session_state.get('flt_category'),
+    sizes=st.session_state.get('flt_size'),
+    price_range=st.session_state.get('flt_price'),
+    hide_sold_out=not st.session_state.get('flt_show_sold_out', False),
+    arrived_only=st.session_state.get('flt_arrived_only', False),
+    ship=st.session_state.get('flt_ship') or None,
+    include_mask=extra_mask,
+)
+facet_counts = catalog.facets.facet_counts(**facet_filters)
+
+
+def facet_label(column):
+    counts = facet_counts.get(column, {})
+    return lambda v: f"{v} ({counts.get(str(v), 0)})"
+
+
+def facet_options_by_count(column, selected_key):
+    """건수 내림차순, 0건 값은 숨김 (단, 이미 선택된 값은 유지)."""
+    counts = facet_counts.get(column, {})
+    selected = st.session_state.get(selected_key) or []
+    options = [v for v, n in sorted(counts.items(), key=lambda kv: -kv[1]) if n > 0]
+    return options + [v for v in selected if v not in options]
 
-# Search Validation (English Only)
-if search_query:
-    if not search_query.isascii():
-        st.sidebar.error("Please enter English only.")
-        search_query = "" # Reset query effectively for filtering
 
 # 2. Brand Filter
-all_brands = sorted([str(x) for x in df['brand'].unique()]) if 'brand' in df.columns else []
-selected_brands = st.sidebar.multiselect(T['brand'], all_brands)
+all_brands = sorted(catalog.facets.values.get('brand', []))
+selected_brands = st.sidebar.multiselect(T['brand'], all_brands, key='flt_brand',
+                                         format_func=facet_label('brand'))
 
 # [NEW] 2.5 Upper Category Filter
 # Sort by count (descending)
-if 'upper_category' in df.columns:
-    upper_counts = df['upper_category'].value_counts()
-    all_upper = upper_counts.index.tolist()
-else:
-    all_upper = []
-    
-selected_upper = st.sidebar.multiselect(T['upper_category'], all_upper)
+all_upper = facet_options_by_count('upper_category', 'flt_upper')
+selected_upper = st.sidebar.multiselect(T['upper_category'], all_upper, key='flt_upper',
+                                        format_func=facet_label('upper_category'))
 
 # 3. Category Filter
-# Sort by count (descending)
-if 'category' in df.columns:
-    if selected_upper and 'upper_category' in df.columns:
-        filtered_sub = df[df['upper_category'].isin(selected_upper)]
-        cat_counts = filtered_sub['category'].value_counts()
-    else:
-        cat_counts = df['category'].value_counts()
-        
-    all_categories = cat_counts.index.tolist()
-else:
-    all_categories = []
-    
-selected_categories = st.sidebar.multiselect(T['category'], all_categories)
+# Sort by count (descending) - 선택된 상위 카테고리 등 다른 조건에 맞는 값만
+all_categories = facet_options_by_count('category', 'flt_category')
+selected_categories = st.sidebar.multiselect(T['category'], all_categories, key='flt_category',
+                                             format_func=facet_label('category'))
 
 # 4. Size Filter
-all_sizes = sorted([str(x) for x in df['size'].unique()]) if 'size' in df.columns else []
-selected_sizes = st.sidebar.multiselect(T['size'], all_sizes)
+all_sizes = sorted(catalog.facets.values.get('size', []))
+selected_sizes = st.sidebar.multiselect(T['size'], all_sizes, key='flt_size',
+                                        format_func=facet_label('size'))
 
 # 5. Price Range
 # User requested only THB unit display, no conversion (Sheet data is already THB)
@@ -767,17 +842,36 @@ slider_max_val = max_price
 if slider_max_val <= slider_min_val:
     slider_max_val = slider_min_val + 10000
 
-cost_range = st.sidebar.slider(T['price_range'], slider_min_val, slider_max_val, (slider_min_val, slider_max_val))
+cost_range = st.sidebar.slider(T['price_range'], slider_min_val, slider_max_val, (slider_min_val, slider_max_val),
+                               key='flt_price')
 
 # Convert back to KRW for filtering (Same now)
 filter_min = cost_range[0]
 filter_max = cost_range[1]
 
 # 6. Status Filter
-show_sold_out = st.sidebar.checkbox(T['show_sold_out'], value=False)
+show_sold_out = st.sidebar.checkbox(T['show_sold_out'], value=False, key='flt_show_sold_out')
 
 # [NEW] Show Arrived Only Checkbox
-show_arrived_only = st.sidebar.checkbox(T['show_arrived_only'], value=False)
+show_arrived_only = st.sidebar.checkbox(T['show_arrived_only'], value=False, key='flt_arrived_only')
+
+# [NEW] 이 배로 오는 상품만 보기 (도착 예정일별 묶음, catalog_index.CohortIndex)
+_ship_keys = catalog.cohorts.keys()
+
+
+def ship_label(key):
+    if not key:
+        return T['ship_all']
+    _d = catalog.cohorts.dates[key]
+    return f"🚢 {_d.month}/{_d.day} · {catalog.cohorts.counts[key]}"
+
+
+selected_ship = None
+if _ship_keys:
+    if st.session_state.get('flt_ship') not in [''] + _ship_keys:
+        st.session_state['flt_ship'] = ''  # 새 카탈로그 버전에서 사라진 배
+    selected_ship = st.sidebar.selectbox(T['ship_filter'], [''] + _ship_keys, key='flt_ship',
+                                         format_func=ship_label) or None
 
 # 7. Debug Mode
 debug_mode = False
@@ -786,28 +880,33 @@ if st.session_state['user'] and st.session_state['user']['user_id'] == 'youini07
     debug_mode = st.sidebar.checkbox("🛠️ Debug Mode", value=False)
 
 # --- Sort + 카탈로그 그리드: 소개 페이지일 때는 건너뜀 ---
-if st.session_state.get('sidebar_page', 'catalog') == 'catalog':
+# [MODIFIED] 카탈로그 영역 전체를 fragment로 → 정렬 / 브랜드 바 / 좋아요 / 페이지 이동은
+#            이 영역만 다시 실행 (쿠키 매니저, 로그인, 사이드바 패싯은 건너뜀).
+#            사이드바 필터가 바뀌면 전체가 다시 실행되므로 항상 최신 조건을 읽음
+@st.fragment
+def render_catalog():
+    # 사이드바 값(패싯 건수, 위시리스트 마스크)을 바꾸는 동작 - 브랜드 바 클릭, 위시리스트 보기 중 좋아요 -
+    # 은 전체를 다시 실행. 콜백 안에서는 st.rerun을 쓸 수 없으므로 콜백은 표시만 하고 여기서 실행
+    if st.session_state.pop('catalog_app_rerun', False):
+        st.rerun(scope="app")
+
+    # 브랜드 바 선택을 반영한 브랜드 조건 (사이드바 값은 전체 실행 때 정해짐)
+    query_brands = selected_brands
+
     sort_option = st.selectbox(T['sort'], T['sort_options'])
+    # [NEW] 페이지 / 더 보기(연속 스크롤) 전환
+    load_more_mode = st.toggle(T['load_more_mode'], key='load_more_mode')
 
     # ─── 인기 브랜드 Top 10 바 ───────────────────────────────────────────────
-    # 브랜드 컬럼에서 갯수 내림차순으로 10개 추출
+    # [MODIFIED] 브랜드 건수는 패싯 건수 서비스에서 (현재 다른 필터 기준) → 갯수 내림차순 10개
     if 'brand' in df.columns and not df.empty:
-        top_brands = (
-            df['brand']
-            .dropna()
-            .astype(str)
-            .str.strip()
-            .replace('', float('nan'))
-            .dropna()
-        )
-        top_brands = top_brands[top_brands != 'Unknown']
-        top_brands = top_brands.value_counts().head(10).index.tolist()
+        _brand_counts = facet_counts.get('brand', {})
+        top_brands = [
+            b for b, n in sorted(_brand_counts.items(), key=lambda kv: -kv[1])
+            if n > 0 and b.strip() and b not in ('Unknown', 'nan')
+        ][:10]
         if top_brands:
-            # ── query_params 기반 브랜드 바 ──────────────────────────────────
-            # 클릭 시 ?bb=브랜드명 파라미터를 URL에 반영 → Streamlit 리로드 시 읽음
-            # st.button 일절 사용 안 함 → 버튼 박스 없음
-
-            # 현재 선택된 브랜드 (query_param 우선, 없으면 session_state)
+            # 현재 선택된 브랜드 (?bb= 파라미터 우선, 없으면 session_state)
             _qb = st.query_params.get('bb', '')
             if _qb:
                 # URL 파라미터가 있으면 session_state에 동기화
@@ -821,445 +920,187 @@ if st.session_state.get('sidebar_page', 'catalog') == 'catalog':
                 'TH': '🔥 แบรนด์ยอดนิยม'
             }.get(lang_code, '🔥 Popular Brands')
 
-            # ── st.button 부활 (기능 보장) + JS 스타일링 ───────────────────
-            # window.top 접근 불가 이슈 해결을 위해 Native st.button 사용
-            # 버튼 박스 제거는 JS로 해당 버튼(라벨에 식별자 포함)을 찾아 스타일 클래스 적용
-
-            # 식별용 Zero Width Space (\u200b)
-            # 버튼 라벨에 이걸 넣어서 JS가 이 버튼만 찾아서 스타일을 바꾸게 함
-            import streamlit.components.v1 as components_v1
-            
-            # 1. CSS 정의 (브랜드 버튼용 클래스)
-            st.markdown("""
-            <style>
-            .brand-text-btn {
-                border: none !important;
-                background: transparent !important;
-                box-shadow: none !important;
-                padding: 0 !important;
-                color: #333 !important;
-                font-size: 17px !important;
-                font-weight: 800 !important;
-                cursor: pointer !important;
-                line-height: 1.5 !important;
-                text-transform: uppercase !important;
-                letter-spacing: 0.02em !important;
-                min-height: 0 !important;
-                height: auto !important;
-                margin: 0 !important;
-            }
-            .brand-text-btn:hover {
-                color: #e63946 !important;
-                text-decoration: underline !important;
-                background: transparent !important;
-            }
-            .brand-text-btn:focus, .brand-text-btn:active {
-                color: #e63946 !important;
-                background: transparent !important;
-                border: none !important;
-                outline: none !important;
-            }
-            .brand-text-btn p {
-                font-size: 17px !important;
-                font-weight: 800 !important;
-                margin: 0 !important;
-                padding: 0 !important;
-            }
-            /* 선택된 상태 (JS로 클래스 추가 예정) */
-            .brand-text-btn-active {
-                color: #e63946 !important;
-                text-decoration: underline !important;
-            }
-            .brand-text-btn-active p {
-                color: #e63946 !important;
-            }
-            </style>
-            """, unsafe_allow_html=True)
-
-            # 2. JS 주입 (버튼 찾아서 클래스 부여 - MutationObserver 사용)
-            # 동적으로 생성되는 버튼도 감지하여 스타일 적용 (깜빡임 최소화)
-            _js_script = """
-            <script>
-            function applyStyle() {
-                try {
-                    const buttons = window.parent.document.querySelectorAll('button');
-                    buttons.forEach(btn => {
-                        if (btn.innerText.includes('\\u200b')) {
-                            btn.classList.add('brand-text-btn');
-                            if (btn.innerText.includes('\\u200d')) {
-                                btn.classList.add('brand-text-btn-active');
-                            }
-                        }
-                    });
-                } catch(e) {}
-            }
-
-            // 1. 초기 로드 시 실행
-            applyStyle();
-
-            // 2. DOM 변화 감지하여 실행 (버튼 추가 시 즉시 적용)
-            const observer = new MutationObserver((mutations) => {
-                applyStyle();
-            });
-            observer.observe(window.parent.document.body, { childList: true, subtree: true });
-            </script>
-            """
-            components_v1.html(_js_script, height=0)
-
-            st.markdown(
-                f"<div style='font-size:11px; font-weight:700; color:#888; letter-spacing:0.08em; margin-bottom:5px; text-transform:uppercase;'>{_brand_bar_label}</div>",
-                unsafe_allow_html=True
-            )
-
-            # 3. 버튼 배치 (5열 그리드)
-            # 한 줄에 5개씩 배치. 논리적 순서 유지를 위해 매 행(Row)마다 컬럼 생성
-            for _r_idx in range(0, len(top_brands), 5):
-                _row_brands = top_brands[_r_idx : _r_idx + 5]
-                _cols = st.columns(5)
-                
-                for _c_idx, _bname in enumerate(_row_brands):
-                    with _cols[_c_idx]:
-                        _is_active = _bname in _bar_selected
-                        # 버튼 라벨: \u200b + 브랜드명 + (\u200d if active)
-                        _label = f"\u200b{_bname}" + ("\u200d" if _is_active else "")
-                        
-                        if st.button(_label, key=f"btn_brand_{_bname}", use_container_width=True):
-                            # 토글 로직
-                            if _bname in st.session_state.get('selected_brands_bar', []):
-                                st.session_state['selected_brands_bar'] = []
-                            else:
-                                st.session_state['selected_brands_bar'] = [_bname]
-                            st.rerun()
-
-
+            # [MODIFIED] st.button 10개 + 문서 전체를 훑는 MutationObserver 스크립트 대신
+            #            자기 버튼만 그리는 컴포넌트 하나 (brand_bar.py). 클릭한 브랜드는 trigger 값으로
+            def toggle_bar_brand():
+                brand = (st.session_state.get('brand_bar') or {}).get('clicked')
+                if not brand:
+                    return
+                if brand in st.session_state.get('selected_brands_bar', []):
+                    st.session_state['selected_brands_bar'] = []
+                else:
+                    st.session_state['selected_brands_bar'] = [brand]
+                if 'bb' in st.query_params:
+                    del st.query_params['bb']  # 클릭 후에는 URL 값이 선택을 덮어쓰지 않게
+                st.session_state['catalog_app_rerun'] = True  # 사이드바 패싯 건수도 새 선택 기준으로
 
+            brand_bar.render_brand_bar(top_brands, _brand_counts, _bar_selected, _brand_bar_label,
+                                       key='brand_bar', on_click=toggle_bar_brand)
 
             # 브랜드 바 선택값을 기존 사이드바 브랜드 필터에 반영
-            if _bar_selected and not selected_brands:
-                selected_brands = _bar_selected
-            elif _bar_selected and selected_brands:
-                selected_brands = list(set(selected_brands) & set(_bar_selected)) or _bar_selected
+            query_brands = combine_brand_selection(selected_brands, _bar_selected)
 
 
     # ─── 카탈로그 필터링 / 정렬 / 그리드 ───────────────────────────────────
     # 소개 페이지일 때는 이 블록 전체가 실행되지 않음
-    filtered_df = df.copy()
-
-    # Filter by Arrival Status (Show Arrived Only)
-    if show_arrived_only:
-        def has_arrival_info(val):
-            s = str(val).strip().lower()
-            return bool(s and s != 'nan' and s != 'nat' and s != 'none' and s != '')
-        if 'arrival_date' in filtered_df.columns:
-            mask_has_arrival = filtered_df['arrival_date'].apply(has_arrival_info)
-            filtered_df = filtered_df[~mask_has_arrival]
-
-    # Filter by My Wishlist (Logic updated to use the checkbox defined earlier)
-    if st.session_state['user']:
-        if show_my_wishlist:
-            my_likes_ids = am.get_user_likes(st.session_state['user']['user_id'])
-            if 'code' in filtered_df.columns:
-                filtered_df = filtered_df[filtered_df['code'].astype(str).isin(my_likes_ids)]
+    # [MODIFIED] df.copy() 대신 불리언 마스크 → 행 번호 배열. 공유 카탈로그는 그대로 둠
+    # [MODIFIED] 브랜드/카테고리/사이즈/품절/도착/가격은 버전별 비트셋 인덱스로 (catalog_index.FacetIndex)
+    #            → 비트 AND/OR 몇 번 + 마지막에 행 번호로 한 번 변환
+    facets = catalog.facets
 
+    # 인덱스에 없는 조건(위시리스트, 검색)은 사이드바에서 만든 불리언 마스크 (extra_mask)
     if debug_mode:
         st.warning("Debug Mode On")
         st.write("### Data Preview")
-        preview_cols = [c for c in ['code', 'name', 'stock', 'price'] if c in filtered_df.columns]
-        st.dataframe(filtered_df[preview_cols].head())
-
-    # Filter: Status ('onsale' vs 'out of stock')
-    if 'stock' in filtered_df.columns:
-        filtered_df['stock_norm'] = filtered_df['stock'].astype(str).str.lower().str.strip()
-        if not show_sold_out:
-            mask = filtered_df['stock_norm'].str.contains('out of stock', na=False)
-            filtered_df = filtered_df[~mask]
-
-    # Filter: Search (Name OR Code)
-    if search_query:
-        search_col_matches = filtered_df['name'].str.contains(search_query, case=False, na=False)
-        if 'code' in filtered_df.columns:
-            search_col_matches = search_col_matches | filtered_df['code'].astype(str).str.contains(search_query, case=False, na=False)
-        if 'id' in filtered_df.columns:
-            search_col_matches = search_col_matches | filtered_df['id'].astype(str).str.contains(search_query, case=False, na=False)
-        filtered_df = filtered_df[search_col_matches]
-
-    # Filter: Brand
-    if selected_brands:
-        filtered_df = filtered_df[filtered_df['brand'].isin(selected_brands)]
-
-    # Filter: Upper Category
-    if selected_upper:
-        if 'upper_category' in filtered_df.columns:
-            filtered_df = filtered_df[filtered_df['upper_category'].isin(selected_upper)]
-
-    # Filter: Category
-    if selected_categories:
-        filtered_df = filtered_df[filtered_df['category'].isin(selected_categories)]
-
-    # Filter: Size
-    if selected_sizes:
-        filtered_df = filtered_df[filtered_df['size'].isin(selected_sizes)]
-
-    # Filter: Price
-    filtered_df = filtered_df[(filtered_df['price'] >= filter_min) & (filtered_df['price'] <= filter_max)]
+        preview_cols = [c for c in ['code', 'name', 'stock', 'price'] if c in df.columns]
+        preview_ids = facets.query(arrived_only=show_arrived_only, include_mask=wish_mask)
+        st.dataframe(catalog.take(preview_ids[:5])[preview_cols])
+        # 카탈로그 버전 / 인덱스 빌드 시간 / 메모리 (콘솔에 매번 찍지 않고 여기서만)
+        st.write("### Catalog", {
+            'version': catalog.version,
+            'rows': len(catalog),
+            'build_ms': catalog.build_ms,
+            'memory_mb': [round(df.attrs.get(k, 0) / 1e6, 2) for k in ('memory_before', 'memory_after')],
+        })
+        # 조회 결과 캐시 적중률 (catalog_query, lru.LRUCache)
+        st.write("### Query Cache", get_query_cache().stats())
+        st.write("### Card HTML Cache", card_grid.get_card_cache().stats())
 
     # --- Sorting ---
-    sort_map = {
-        "최신순": "Newest", "Newest (Newest)": "Newest", "ล่าสุด (Newest)": "Newest",
-        "가격 낮은순": "Price_Low", "Price: Low to High (Low-High)": "Price_Low", "ราคา: ต่ำไปสูง (Low-High)": "Price_Low",
-        "가격 높은순": "Price_High", "Price: High to Low (High-Low)": "Price_High", "ราคา: สูงไปต่ำ (High-Low)": "Price_High",
-        "이름순": "Name", "Name (Name)": "Name", "ชื่อ (Name)": "Name"
-    }
-    s_opt = sort_option
-    if "Newest" in s_opt or "ล่าสุด" in s_opt or "최신" in s_opt:
-        current_sort = "Newest"
-    elif "Low" in s_opt or "ต่ำไปสูง" in s_opt or "낮은" in s_opt:
-        current_sort = "Price_Low"
-    elif "High" in s_opt or "สูงไปต่ำ" in s_opt or "높은" in s_opt:
-        current_sort = "Price_High"
-    else:
-        current_sort = "Name"
-
-    if current_sort == "Newest":
-        if 'updated_at' in filtered_df.columns:
-            parsed_dates = pd.to_datetime(filtered_df['updated_at'], format='%m/%d', errors='coerce')
-            mask = parsed_dates.isna()
-            if mask.any():
-                parsed_dates.loc[mask] = pd.to_datetime(filtered_df.loc[mask, 'updated_at'], errors='coerce')
-            filtered_df['sort_date'] = parsed_dates
-            filtered_df = filtered_df.sort_values(by='sort_date', ascending=False)
-    elif current_sort == "Price_Low":
-        filtered_df = filtered_df.sort_values(by='price', ascending=True)
-    elif current_sort == "Price_High":
-        filtered_df = filtered_df.sort_values(by='price', ascending=False)
-    elif current_sort == "Name":
-        filtered_df = filtered_df.sort_values(by='name', ascending=True)
+    # [MODIFIED] 선택지 위치로 정렬 이름 결정 (언어별 문자열 비교 대신) - sort_options와 같은 순서
+    current_sort = SORT_NAMES[T['sort_options'].index(sort_option)]
+
+    # 좋아요 수 (좋아요 순 정렬 + 카드 하트 표시에 같이 사용)
+    all_counts = am.get_all_like_counts()
+
+    # Filter: Arrival / Status / Brand / Upper Category / Category / Size / Price + Sort
+    # [MODIFIED] 비트셋 필터 → 미리 정렬된 순열로 걸러냄 (catalog_index.FacetIndex / SortIndex)
+    #            결과 행 번호는 세션 공용 LRU 캐시에 (catalog_query). 위시리스트는 사용자별이라 캐시 안 함
+    # [MODIFIED] 결과는 지연 계산 (QueryResult) - 전체 건수만 바로 알고, 행 번호는 보여줄 만큼만 만듦
+    query_result = query_catalog(
+        catalog,
+        search=search_query,
+        search_mask=search_mask,
+        personal_mask=wish_mask,
+        brands=query_brands,
+        upper=selected_upper,
+        categories=selected_categories,
+        sizes=selected_sizes,
+        price_range=(filter_min, filter_max),
+        hide_sold_out=not show_sold_out,
+        arrived_only=show_arrived_only,
+        ship=selected_ship,
+        sort=current_sort,
+        like_counts=all_counts,
+        search_scanned=search_scanned,
+    )
 
     # --- Pagination ---
     if 'page' not in st.session_state:
         st.session_state.page = 1
 
     items_per_page = 12
-    total_items = len(filtered_df)
+    total_items = query_result.total
     total_pages = max(1, (total_items - 1) // items_per_page + 1)
 
     if st.session_state.page > total_pages:
         st.session_state.page = 1
 
-    start_idx = (st.session_state.page - 1) * items_per_page
-    end_idx = start_idx + items_per_page
-    page_items = filtered_df.iloc[start_idx:end_idx]
+    # [NEW] "더 보기" 모드: 페이지 대신 카드를 아래로 계속 이어 붙임 (모바일에서 깊게 스크롤)
+    # 필터/정렬이 바뀌면 처음 12개부터 다시 시작
+    if st.session_state.get('load_more_key') != query_result.key:
+        st.session_state['load_more_key'] = query_result.key
+        st.session_state['visible_count'] = items_per_page
+
+    if load_more_mode:
+        start_idx = 0
+        end_idx = st.session_state['visible_count']
+    else:
+        start_idx = (st.session_state.page - 1) * items_per_page
+        end_idx = start_idx + items_per_page
+    # 보여줄 행 번호만 계산 (미리 정렬된 순열을 필요한 만큼만 훑음) → 그 행들만 꺼냄
+    page_items = catalog.take(query_result.ids(start_idx, end_idx))
 
     # --- Display Grid (3 per row) ---
     st.divider()
     st.subheader(T['total_items'].format(total=total_items, current=len(page_items)))
 
-    all_counts = am.get_all_like_counts()
     my_likes_set = set()
     if st.session_state['user']:
         my_likes_set = am.get_user_likes(st.session_state['user']['user_id'])
 
-    page_items = page_items.reset_index(drop=True)
-
-    for i in range(0, items_per_page, 3):
-        batch = page_items.iloc[i:i+3]
-        if batch.empty:
-            break
-
-        cols = st.columns(3)
-        for idx, row in batch.iterrows():
-            col_idx = idx % 3
-            with cols[col_idx]:
-                status_val = str(row.get('stock', '')).lower().strip()
-                is_sold = 'out of stock' in status_val or 'sold' in status_val
-
-                opacity_style = "opacity: 0.5;" if is_sold else ""
-                st.markdown(f'<div style="{opacity_style} position: relative;">', unsafe_allow_html=True)
-
-                img_url = get_image_url(row.get('image_file_id'))
-                img_html = ""
-                if img_url:
-                    img_html = f'<img src="{img_url}" style="width:100%; aspect-ratio: 9/8; object-fit: cover; object-position: top; border-radius:5px;" loading="lazy">'
-                else:
-                    img_html = f'<div style="width:100%; aspect-ratio: 9/8; background:#f0f0f0; display:flex; align-items:center; justify-content:center; border-radius:5px;">{T["no_image"]}</div>'
-
-                arrival_val = str(row.get('arrival_date', '')).strip()
-                is_arrival_valid = arrival_val and arrival_val.lower() != 'nan' and arrival_val.lower() != 'nat' and len(arrival_val) > 0
-
-                # ─── 가격 / 할인율 계산 (이미지 오버레이보다 먼저 계산) ─────────────
-                import math
-                price_val = row.get('price', 0)
-                price_plain = f"{T['currency_symbol']}{price_val:,}"  # type: ignore
-
-                _orig_price = row.get('original_price', float('nan'))
-                try:
-                    _orig_price = float(_orig_price)
-                    _has_discount = not math.isnan(_orig_price) and _orig_price > 0 and _orig_price > price_val
-                except (TypeError, ValueError):
-                    _has_discount = False
+    # [MODIFIED] 카드 12개 = HTML 한 덩어리 + 컴포넌트 하나 (card_grid.py)
+    #            좋아요 / 상세 클릭은 컴포넌트 trigger → 아래 콜백에서 처리
+    def handle_card_action():
+        action = (st.session_state.get('card_grid') or {}).get('action')
+        if not action:
+            return
+        if action.get('type') == 'detail':
+            st.session_state['detail_code'] = str(action.get('code'))
+        elif not st.session_state.get('user'):
+            st.toast(T['login_required'], icon="🔒")
+        elif action.get('type') == 'like':
+            am.toggle_like(st.session_state['user']['user_id'], str(action.get('code')))
+            if st.session_state.get('show_wishlist'):
+                st.session_state['catalog_app_rerun'] = True  # 좋아요 취소한 상품을 위시리스트에서 빼기
+
+    # [NEW] 상세 정보는 상세 버튼을 누른 상품 하나만, 누른 순간에 만들어서 다이얼로그로
+    #       (설명 fallback / 비슷한 상품 / LINE 문의 링크 - 카드마다 미리 만들지 않음)
+    @st.dialog(T['detail_btn'], width="large")
+    def show_product_detail(code):
+        row = catalog.row(code)
+        if row is None:
+            st.write('-')
+            return
+        st.markdown(f"**[{row.get('brand', 'Unknown')}] {row.get('name', 'No Name')}**")
+        st.write(T['desc_title'])
+        st.write(card_grid.description_text(row))
+
+        _similar_html = card_grid.similar_strip_html(catalog, code, T)
+        if _similar_html:
+            st.markdown(_similar_html, unsafe_allow_html=True)
+
+        st.write(f"---")
+        st.write(f"{T['date_title']}: {row.get('updated_at', '-')}")
+
+        if not bool(row['is_sold']):
+            if st.session_state['user']:
+                line_url = card_grid.line_url(row, T, st.session_state['user'])
+                st.markdown(f"""
+                <a href="{html.escape(line_url)}" target="_blank" style="text-decoration:none;">
+                    <button style="width:100%; background-color:#06C755; color:white; border:none; padding:10px; border-radius:5px; font-weight:bold; cursor:pointer;">
+                        {T['line_btn']}
+                    </button>
+                </a>
+                """, unsafe_allow_html=True)
+            else:
+                if st.button(T['line_btn'], key=f"guest_line_{code}"):
+                    st.toast(T['login_required'], icon="🔒")
+                    st.error(T['login_required'])
+        else:
+            st.error(T['sold_btn'])
 
+    grid_payload = card_grid.page_payload(page_items, T, lang_code, catalog, all_counts, my_likes_set,
+                                          st.session_state['user'])
+    card_grid.render_card_grid(grid_payload, key='card_grid', on_action=handle_card_action)
+    st.markdown("---")
 
-                if _has_discount:
-                    _discount_pct = round((1 - price_val / _orig_price) * 100)
-                    _discount_badge = f'<div style="position:absolute; top:8px; right:8px; background:rgba(30,30,30,0.82); color:#fff; font-size:14px; font-weight:900; border-radius:6px; padding:4px 9px; z-index:20; letter-spacing:0.5px;">{_discount_pct}%</div>'
-                else:
-                    _discount_badge = ''
-
-                link_target = img_url if img_url else ""
-
-                if is_sold:
-                    overlay_html = f"""
-                    <div style="position: relative; width: 100%;">
-                        <div style="opacity: 0.5;">
-                            <a href="{link_target}" target="_blank" style="display: block; cursor: pointer;">
-                                {img_html}
-                            </a>
-                        </div>
-                        <div style="position: absolute; top: 50%; left: 50%; transform: translate(-50%, -50%);
-                                    color: white; font-size: 20px; font-weight: bold;
-                                    background-color: rgba(0,0,0,0.6); padding: 10px 20px; border-radius: 5px;
-                                    pointer-events: none; white-space: nowrap; z-index: 10;">
-                            {T['sold_out']}
-                        </div>
-                        {_discount_badge}
-                    </div>
-                    """
-                    st.markdown(overlay_html, unsafe_allow_html=True)
-                elif is_arrival_valid:
-                    final_val = arrival_val
-                    if arrival_val.upper() == 'TBD' or arrival_val == '미정':
-                        final_val = T['arrival_tbd']
-                    display_text = f"{T['arrival_title']} : {final_val}"
-                    overlay_html = f"""
-                    <div style="position: relative; width: 100%;">
-                        <a href="{link_target}" target="_blank" style="display: block; cursor: pointer;">
-                            {img_html}
-                        </a>
-                        <div style="position: absolute; bottom: 10px; left: 0; width: 100%;
-                                    color: white; font-size: 20px; font-weight: bold;
-                                    background-color: rgba(0,0,0,0.6); padding: 5px 0;
-                                    pointer-events: none; z-index: 10; text-align: center;">
-                            {display_text}
-                        </div>
-                        {_discount_badge}
-                    </div>
-                    """
-                    st.markdown(overlay_html, unsafe_allow_html=True)
-                else:
-                    if link_target:
-                        overlay_html = f"""
-                        <div style="position: relative; width: 100%;">
-                            <a href="{link_target}" target="_blank" style="display:block; cursor:pointer;">{img_html}</a>
-                            {_discount_badge}
-                        </div>
-                        """
-                        st.markdown(overlay_html, unsafe_allow_html=True)
-                    else:
-                        st.markdown(f"<div>{img_html}</div>", unsafe_allow_html=True)
-
-                code = row.get('code', '-')
-                brand = row.get('brand', 'Unknown')
-                name = row.get('name', 'No Name')
-                # price_val, price_plain은 이미 위 할인율 계산 블록에서 정의됨
-
-                # ─── 가격 표시: 출고가 취소선 + 판매가 파란색 ───────────────────
-                if is_sold:
-                    price_display = f"<span style='color:#999; text-decoration:line-through; font-size:16px;'>{T['sold_out']}</span>"
-                    price_str = price_plain
-                elif _has_discount:
-                    # 출고가(취소선 회색) + 판매가(파란색 굵게)
-                    _orig_plain = f"{T['currency_symbol']}{int(_orig_price):,}"
-                    price_display = (
-                        f"<span style='color:#aaa; text-decoration:line-through; font-size:14px; margin-right:5px;'>{_orig_plain}</span>"
-                        f"<span style='color:#007bff; font-weight:900; font-size:20px;'>{price_plain}</span>"
-                    )
-                    price_str = price_plain
-                else:
-                    price_display = f"<span style='color:#007bff; font-weight:bold; font-size:20px;'>{price_plain}</span>"
-                    price_str = price_plain
-
-                size = row.get('size', '-')
-                condition = row.get('condition', '-')
-
-                st.markdown(f"<div class='product-title'>[{brand}] {name}</div>", unsafe_allow_html=True)
-                st.markdown(f"<div class='product-price'>{price_display}</div>", unsafe_allow_html=True)
-
-                m_col1, m_col2 = st.columns([7, 3])
-                with m_col1:
-                    st.markdown(f"""
-                    <div style="font-size: 13px; color: #666; margin-top: 5px; white-space: nowrap; overflow: hidden; text-overflow: ellipsis;">
-                        Code : {code} | {T['size']} : {size} | Cond : {condition}
-                    </div>
-                    """, unsafe_allow_html=True)
-
-                    measured = row.get('measured_size', '-')
-                    if measured and str(measured).lower() != 'nan' and str(measured).strip() != '':
-                        st.markdown(f"""
-                        <div style="font-size: 15px; color: #333; margin-top: 2px; white-space: nowrap; overflow: hidden; text-overflow: ellipsis; font-weight: bold;">
-                            {T['measured_size']} : {measured}
-                        </div>
-                        """, unsafe_allow_html=True)
-
-                with m_col2:
-                    p_code = str(code)
-                    likes_num = all_counts.get(p_code, 0)
-                    if st.session_state.get('user'):
-                        is_liked = p_code in my_likes_set
-                        heart_icon = "❤️" if is_liked else "🤍"
-                        if st.button(f"{heart_icon} {likes_num}", key=f"like_{p_code}", help="Add to Wishlist"):
-                            am.toggle_like(st.session_state['user']['user_id'], p_code)
-                            st.rerun()
-                    else:
-                        if st.button(f"🤍 {likes_num}", key=f"like_{p_code}"):
-                            st.toast(T['login_required'], icon="🔒")
-
-                st.markdown('</div>', unsafe_allow_html=True)
-
-                with st.expander(T['detail_btn']):
-                    st.write(T['desc_title'])
-                    desc_text = row.get('description')
-                    if not desc_text or str(desc_text).strip() == '-' or str(desc_text).strip() == '':
-                        desc_text = row.get('product description')
-                    if not desc_text or str(desc_text).strip() == '-' or str(desc_text).strip() == '':
-                        desc_text = row.get('detail')
-                    if not desc_text or str(desc_text).strip() == '-' or str(desc_text).strip() == '':
-                        desc_text = '-'
-                    st.write(desc_text)
-                    st.write(f"---")
-                    st.write(f"{T['date_title']}: {row.get('updated_at', '-')}")
-
-                    if not is_sold:
-                        if st.session_state['user']:
-                            u_id = st.session_state['user']['user_id']
-                            u_name = st.session_state['user'].get('name', 'Unknown')
-                            contact_text = T['contact_msg'].format(
-                                code=code, brand=brand, name=name, price=price_str,
-                                user_id=u_id, user_name=u_name
-                            )
-                            import urllib.parse
-                            encoded_msg = urllib.parse.quote(contact_text)
-                            LINE_ID = "@102ipvys"
-                            line_url = f"https://line.me/R/oaMessage/{LINE_ID}/?{encoded_msg}"
-                            st.markdown(f"""
-                            <a href="{line_url}" target="_blank" style="text-decoration:none;">
-                                <button style="width:100%; background-color:#06C755; color:white; border:none; padding:10px; border-radius:5px; font-weight:bold; cursor:pointer;">
-                                    {T['line_btn']}
-                                </button>
-                            </a>
-                            <div style="height: 30px;"></div>
-                            """, unsafe_allow_html=True)
-                        else:
-                            if st.button(T['line_btn'], key=f"guest_line_{code}"):
-                                st.toast(T['login_required'], icon="🔒")
-                                st.error(T['login_required'])
-                            st.markdown('<div style="height: 30px;"></div>', unsafe_allow_html=True)
-                    else:
-                        st.error(T['sold_btn'])
-
-                st.markdown("---")
+    _detail_code = st.session_state.pop('detail_code', None)
+    if _detail_code:
+        show_product_detail(_detail_code)
 
     # --- Pagination Controls ---
-    if total_pages > 1:
+    if load_more_mode:
+        # [NEW] 다음 12개를 아래에 이어 붙임 (이미 보이는 카드는 같은 key라 그대로 유지)
+        if end_idx < total_items:
+            def show_more():
+                st.session_state['visible_count'] += items_per_page
+
+            _lm_l, _lm_c, _lm_r = st.columns([1, 1, 1])
+            with _lm_c:
+                st.button(T['load_more'].format(shown=min(end_idx, total_items), total=total_items),
+                          on_click=show_more, use_container_width=True, key="load_more_btn")
+    elif total_pages > 1:
         st.markdown("<div style='margin-top: 20px;'></div>", unsafe_allow_html=True)
 
         current_page = st.session_state.page
@@ -1310,32 +1151,33 @@ if st.session_state.get('sidebar_page', 'catalog') == 'catalog':
         </style>
         """, unsafe_allow_html=True)
 
-        try:
-            current_index = page_options.index(current_page)
-        except ValueError:
-            current_index = 0
+        # [MODIFIED] 페이지 이동은 on_change 콜백에서 (st.rerun 없이 카탈로그 fragment 실행 한 번)
+        _page_key = f"pagination_unified_{start_page}"
+        if st.session_state.get(_page_key) != current_page:
+            st.session_state[_page_key] = current_page  # 필터 변경으로 1페이지로 돌아간 경우 등
+
+        def go_to_page():
+            selected_p = st.session_state[_page_key]
+            if selected_p == "◀":
+                st.session_state.page = start_page - 1
+            elif selected_p == "▶":
+                st.session_state.page = end_page + 1
+            else:
+                st.session_state.page = selected_p
 
         col_left, col_center, col_right = st.columns([1, 1, 1])
         with col_center:
-            selected_p = st.radio(
+            st.radio(
                 "Go to page:",
                 options=page_options,
-                index=current_index,
                 horizontal=True,
                 label_visibility="collapsed",
-                key=f"pagination_unified_{start_page}"
+                key=_page_key,
+                on_change=go_to_page,
             )
 
-        if selected_p == "◀":
-            st.session_state.page = start_page - 1
-            st.rerun()
-        elif selected_p == "▶":
-            st.session_state.page = end_page + 1
-            st.rerun()
-        elif selected_p != st.session_state.page:
-            st.session_state.page = selected_p
-            st.rerun()
-
         st.markdown(f"<div style='text-align: center; color: #666; margin-top: 5px;'>Page {st.session_state.page} / {total_pages}</div>", unsafe_allow_html=True)
 
 
+if st.session_state.get('sidebar_page', 'catalog') == 'catalog':
+    render_catalog()
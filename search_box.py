@@ -0,0 +1,165 @@
+"""
+search_box.py
+-------------
+사이드바 검색창 + 자동완성 (st.components.v2 컴포넌트 하나).
+
+카탈로그 버전마다 만든 접두어 색인(catalog_search.PrefixIndex)의 정렬 배열을
+그대로 브라우저로 넘기고, 입력 중 완성은 브라우저에서 이진 탐색으로 처리.
+→ 키 입력마다 스크립트 rerun 없음. Enter 또는 추천어 클릭 때만 검색어를 서버로 보냄.
+  목록에 없는 검색어(제품번호 등)도 그대로 입력해서 검색 가능.
+"""
+
+import streamlit as st
+
+BOX_CSS = """
+.search-box { position: relative; font-family: inherit; }
+.search-label { display: block; font-size: 14px; color: inherit; margin-bottom: 4px; }
+.search-input {
+    width: 100%; box-sizing: border-box; padding: 8px 10px; font: inherit; font-size: 14px;
+    border: 1px solid rgba(49, 51, 63, 0.2); border-radius: 8px; background: #fff; color: #31333f;
+}
+.search-input:focus { outline: none; border-color: #e63946; }
+.search-list {
+    list-style: none; margin: 4px 0 0; padding: 4px 0; max-height: 320px; overflow-y: auto;
+    border: 1px solid rgba(49, 51, 63, 0.2); border-radius: 8px; background: #fff;
+    box-shadow: 0 4px 12px rgba(0, 0, 0, 0.08);
+}
+.search-list li {
+    padding: 6px 10px; font-size: 14px; color: #31333f; cursor: pointer;
+    white-space: nowrap; overflow: hidden; text-overflow: ellipsis;
+}
+.search-list li.active, .search-list li:hover { background: #f0f2f6; }
+"""
+
+BOX_JS = """
+const LIMIT = 10;
+
+// 정렬된 keys에서 prefix로 시작하는 구간 → 항목 번호(= 순위)가 작은 것부터 LIMIT개
+function lookup(index, prefix) {
+    const { keys, owners, texts } = index;
+    let lo = 0, hi = keys.length;
+    while (lo < hi) {
+        const mid = (lo + hi) >> 1;
+        if (keys[mid] < prefix) lo = mid + 1; else hi = mid;
+    }
+    const ids = new Set();
+    for (let i = lo; i < keys.length && keys[i].startsWith(prefix); i++) ids.add(owners[i]);
+    return [...ids].sort((a, b) => a - b).slice(0, LIMIT).map((i) => texts[i]);
+}
+
+const normalize = (text) => text.normalize('NFKC').toLowerCase();
+
+// 입력 전체로 먼저 찾고, 없으면 마지막 단어만 완성 ("nike hoo" → "nike hoodie")
+function complete(index, text) {
+    if (!index || !text.trim()) return [];
+    const found = lookup(index, normalize(text.trimStart()));
+    const cut = text.search(/\\S+$/);
+    if (found.length || cut <= 0) return found;
+    return lookup(index, normalize(text.slice(cut))).map((t) => text.slice(0, cut) + t);
+}
+
+export default function(component) {
+    const { data, setStateValue, parentElement } = component;
+    let root = parentElement.querySelector('.search-box');
+    if (!root) {
+        root = document.createElement('div');
+        root.className = 'search-box';
+        const label = document.createElement('label');
+        label.className = 'search-label';
+        const input = document.createElement('input');
+        input.className = 'search-input';
+        input.type = 'text';
+        input.autocomplete = 'off';
+        const list = document.createElement('ul');
+        list.className = 'search-list';
+        list.hidden = true;
+        root.append(label, input, list);
+        parentElement.appendChild(root);
+    }
+    const input = root.querySelector('.search-input');
+    const list = root.querySelector('.search-list');
+    root.querySelector('.search-label').textContent = data.label;
+    input.placeholder = data.placeholder;
+    // 서버 쪽 값이 바뀐 경우에만 입력창을 덮어씀 (입력 중인 글자는 유지)
+    if (root._value !== data.value) {
+        root._value = data.value;
+        input.value = data.value;
+    }
+
+    const submit = (value) => {
+        list.hidden = true;
+        input.value = value;
+        root._value = value;
+        setStateValue('value', value);
+    };
+    const highlight = (items, active) => {
+        items.forEach((li, i) => li.classList.toggle('active', i === active));
+        root._active = active;
+    };
+    const show = () => {
+        const options = complete(data.index, input.value);
+        list.replaceChildren(...options.map((text) => {
+            const li = document.createElement('li');
+            li.textContent = text;
+            li.dataset.value = text;
+            return li;
+        }));
+        list.hidden = !options.length;
+        root._active = -1;
+    };
+
+    input.oninput = show;
+    input.onfocus = show;
+    input.onblur = () => { list.hidden = true; };
+    input.onkeydown = (e) => {
+        const items = [...list.children];
+        if (e.key === 'ArrowDown' || e.key === 'ArrowUp') {
+            if (!items.length) return;
+            e.preventDefault();
+            // -1 = 입력창 그대로, 끝에서 다시 처음으로
+            let next = root._active + (e.key === 'ArrowDown' ? 1 : -1);
+            if (next >= items.length) next = -1;
+            if (next < -1) next = items.length - 1;
+            highlight(items, next);
+        } else if (e.key === 'Enter') {
+            e.preventDefault();
+            const picked = !list.hidden && items[root._active];
+            submit(picked ? picked.dataset.value : input.value.trim());
+        } else if (e.key === 'Escape') {
+            list.hidden = true;
+        }
+    };
+    // mousedown: blur로 목록이 닫히기 전에 선택
+    list.onmousedown = (e) => {
+        const li = e.target.closest('li');
+        if (!li) return;
+        e.preventDefault();
+        submit(li.dataset.value);
+    };
+}
+"""
+
+_box_component = None
+
+
+def _component():
+    global _box_component
+    if _box_component is None:
+        _box_component = st.components.v2.component("search_box", css=BOX_CSS, js=BOX_JS)
+    return _box_component
+
+
+def render_search_box(autocomplete, label, placeholder, key, on_change):
+    """
+    검색창 마운트 → 현재 검색어 (Enter / 추천어 선택 때만 바뀜).
+    autocomplete가 None이면 (콜드 스타트 직후 색인 빌드 중) 추천어 없이 입력만.
+    """
+    value = (st.session_state.get(key) or {}).get('value') or ''
+    data = {
+        'label': label,
+        'placeholder': placeholder,
+        'value': value,
+        'index': autocomplete.payload if autocomplete is not None else None,
+    }
+    result = _component()(data=data, key=key, default={'value': value}, on_value_change=on_change)
+    return result.value or ''
@@ -0,0 +1,144 @@
+"""
+sheet_client.py
+---------------
+Google Sheets 접속 공용 모듈 (data_loader.py / auth_manager.py 공유).
+
+- 프로세스당 gspread 클라이언트 1개만 인증해서 재사용
+- 스프레드시트 이름 → ID 를 한 번만 찾아서 메모리 + 디스크(.cache/spreadsheet_ids.json)에 보관
+  → 매 갱신마다 list_spreadsheet_files()로 Drive 전체를 훑지 않음
+- 캐시된 ID로 열기에 실패했을 때만 다시 찾음
+"""
+
+import json
+import os
+import threading
+
+import gspread
+import requests
+from google.auth.exceptions import GoogleAuthError
+from google.oauth2.service_account import Credentials
+
+CATALOG_SPREADSHEET = "상품목록"
+
+SCOPES = [
+    "https://www.googleapis.com/auth/spreadsheets",
+    "https://www.googleapis.com/auth/drive",
+]
+
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache")
+ID_CACHE_FILE = os.path.join(CACHE_DIR, "spreadsheet_ids.json")
+
+_lock = threading.RLock()
+_client = None
+_ids = None        # {spreadsheet name: id}
+_handles = {}      # {spreadsheet name: gspread.Spreadsheet}
+
+
+def get_client():
+    """One authorized gspread client per process (credentials from Streamlit secrets)."""
+    global _client
+    with _lock:
+        if _client is None:
+            import streamlit as st
+            creds = Credentials.from_service_account_info(
+                st.secrets["gcp_service_account"], scopes=SCOPES
+            )
+            _client = gspread.authorize(creds)
+        return _client
+
+
+def _load_ids():
+    global _ids
+    if _ids is None:
+        try:
+            with open(ID_CACHE_FILE, "r", encoding="utf-8") as f:
+                _ids = json.load(f)
+        except Exception:
+            _ids = {}
+    return _ids
+
+
+def _save_ids():
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        tmp = ID_CACHE_FILE + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(_ids, f, ensure_ascii=False)
+        os.replace(tmp, ID_CACHE_FILE)
+    except Exception as e:
+        print(f"[SheetClient] Failed to persist spreadsheet ids: {e}")
+
+
+def invalidate_handle(name=CATALOG_SPREADSHEET):
+    """Drop only the cached handle; the next open re-opens by ID (and re-resolves if that fails)."""
+    with _lock:
+        _handles.pop(name, None)
+
+
+def forget_spreadsheet(name):
+    """Drop the cached ID/handle so the next open re-resolves it."""
+    with _lock:
+        _handles.pop(name, None)
+        if _load_ids().pop(name, None) is not None:
+            _save_ids()
+
+
+def resolve_spreadsheet_id(name=CATALOG_SPREADSHEET, client=None):
+    """Spreadsheet name -> ID. Lists Drive files only when the ID is not cached yet."""
+    with _lock:
+        ids = _load_ids()
+        if name in ids:
+            return ids[name]
+
+        client = client or get_client()
+        # title 필터를 Drive 쿼리로 넘겨서 공유된 파일 전체를 받지 않음
+        files = client.list_spreadsheet_files(title=name)
+        match = next((f for f in files if f["name"] == name), None)
+        if match:
+            spreadsheet_id = match["id"]
+        else:
+            # 목록에 안 나오면 이름으로 직접 열기 시도
+            spreadsheet_id = client.open(name).id
+
+        ids[name] = spreadsheet_id
+        _save_ids()
+        return spreadsheet_id
+
+
+def open_spreadsheet(name=CATALOG_SPREADSHEET, client=None):
+    """
+    Open (and cache) the spreadsheet handle.
+    If opening by the cached ID fails (deleted/re-shared sheet), re-resolve once and retry.
+    """
+    with _lock:
+        if name in _handles and client is None:
+            return _handles[name]
+
+        c = client or get_client()
+        spreadsheet_id = resolve_spreadsheet_id(name, client=c)
+        try:
+            sh = c.open_by_key(spreadsheet_id)
+        except Exception as e:
+            print(f"[SheetClient] Open by cached id failed ({e}), re-resolving '{name}'")
+            forget_spreadsheet(name)
+            sh = c.open_by_key(resolve_spreadsheet_id(name, client=c))
+
+        if client is None:
+            _handles[name] = sh
+        return sh
+
+
+def get_modified_time(name=CATALOG_SPREADSHEET, client=None):
+    """
+    Drive modifiedTime of the spreadsheet (one small metadata call, no cell data).
+    Needs gspread>=6 (Client.get_file_drive_metadata); anything other than an API /
+    network / auth failure is raised instead of silently forcing a full reload.
+    """
+    c = client or get_client()
+    spreadsheet_id = resolve_spreadsheet_id(name, client=c)
+    try:
+        return c.get_file_drive_metadata(spreadsheet_id).get("modifiedTime")
+    except (gspread.exceptions.APIError, requests.exceptions.RequestException, GoogleAuthError) as e:
+        # 일시적 오류면 None → 호출 측은 전체 로드로 진행 (그때 open_spreadsheet가 ID 재확인)
+        print(f"[SheetClient] modifiedTime probe failed ({type(e).__name__}): {e}")
+        return None
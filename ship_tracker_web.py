@@ -59,17 +59,27 @@ I18N = {
 }
 
 
-def _parse_arrivals(arrival_dates: list, lang: str = "KR") -> list:
-    """도착 예정일 문자열 리스트 → 운항 스케줄 dict 리스트."""
+def _parse_arrivals(arrival_dates: list, lang: str = "KR", counts: dict = None) -> list:
+    """
+    도착 예정일 리스트 → 운항 스케줄 dict 리스트.
+    datetime이면 그대로 사용 (catalog_index.CohortIndex가 이미 파싱/중복 제거), 문자열이면 파싱.
+    counts: {'YYYY-MM-DD': 상품 수} → 말풍선 라벨에 표시
+    """
     t = I18N.get(lang, I18N["KR"])
     schedules = []
     seen = set()
 
     for raw in arrival_dates:
-        if not raw or not str(raw).strip():
+        if isinstance(raw, datetime.datetime):
+            arrival = raw
+        elif not raw or not str(raw).strip():
             continue
+        else:
+            try:
+                arrival = date_parser.parse(str(raw).strip())
+            except Exception:
+                continue
         try:
-            arrival = date_parser.parse(str(raw).strip())
             key = arrival.date().isoformat()
             if key in seen:
                 continue
@@ -88,6 +98,8 @@ def _parse_arrivals(arrival_dates: list, lang: str = "KR") -> list:
                 label = f"{t['arrives']} {month}/{day}"
             else:  # TH
                 label = f"{t['arrives']} {month}/{day}"
+            if counts and counts.get(key):
+                label = f"{label} · {counts[key]}"
 
             schedules.append({
                 "start":  departure,
@@ -115,15 +127,17 @@ def get_ship_tracker_html(
     now: datetime.datetime = None,
     height: int = 280,
     lang: str = "KR",
+    counts: dict = None,
 ) -> str:
     """
     해상 운송 노선 트래커 HTML 문자열 반환.
 
     Args:
-        arrival_dates : 도착 예정일 문자열 리스트
+        arrival_dates : 도착 예정일 리스트 (문자열 또는 datetime)
         now           : 기준 시각 (None → 실제 현재 시각)
         height        : 컨테이너 높이(px)
         lang          : 'KR' | 'EN' | 'TH'
+        counts        : {'YYYY-MM-DD': 상품 수} (선택) → 배마다 상품 수 표시
     """
     t = I18N.get(lang, I18N["KR"])
 
@@ -138,7 +152,7 @@ def get_ship_tracker_html(
     if now is None:
         now = datetime.datetime.now()
 
-    schedules = _parse_arrivals(arrival_dates, lang=lang)
+    schedules = _parse_arrivals(arrival_dates, lang=lang, counts=counts)
 
     # ── 선박 위치 계산 (Python → JS 전달) ──
     ships_js = []
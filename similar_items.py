@@ -0,0 +1,116 @@
+"""
+similar_items.py
+----------------
+"이런 상품은 어때요?" 추천용 유사 상품 인덱스 (카탈로그 버전당 한 번, Catalog 생성 시 빌드).
+
+- 상품명 + 브랜드의 문자 3-gram TF-IDF 벡터 (feature hashing, HASH_DIM 차원, L2 정규화)
+- 같은 브랜드 / 같은 사이즈 가산점, 가격 차이(로그) 감점
+- 같은 카테고리 안에서만, 가격순으로 정렬한 뒤 가까운 가격대 WINDOW개만 후보로 비교
+  → 전체 쌍을 비교하지 않고 행렬 곱 몇 번으로 끝남
+- 상품마다 상위 TOP_K개 (품절 제외)의 행 번호를 (n × TOP_K) 배열로 저장
+  → 상세 화면에서는 제품번호 → 행 번호 dict 조회 + 배열 한 줄 읽기만
+"""
+
+import zlib
+
+import numpy as np
+
+from catalog_search import normalize_text
+
+TOP_K = 4
+HASH_DIM = 256      # 3-gram 해시 차원
+WINDOW = 1000       # 가격순 이웃 후보 수 (카테고리 안에서)
+CHUNK = 256         # 한 번에 점수를 계산하는 상품 수
+
+# 점수 가중치: 텍스트 코사인 + 브랜드/사이즈 일치 - 가격 차이
+W_BRAND = 0.3
+W_SIZE = 0.1
+W_PRICE = 0.2       # |log(가격 비율)| 1당 감점
+
+
+def _text_vectors(texts):
+    """Hashed char-3-gram TF-IDF rows (float32, L2-normalized)."""
+    n = len(texts)
+    rows, cols = [], []
+    for i, text in enumerate(texts):
+        t = f" {text} "
+        for j in range(len(t) - 2):
+            rows.append(i)
+            cols.append(zlib.crc32(t[j:j + 3].encode('utf-8')) % HASH_DIM)
+    tf = np.zeros((n, HASH_DIM), dtype=np.float32)
+    np.add.at(tf, (np.asarray(rows, dtype=np.int64), np.asarray(cols, dtype=np.int64)), 1.0)
+
+    df_count = np.count_nonzero(tf, axis=0)
+    idf = np.log((1 + n) / (1 + df_count)).astype(np.float32) + 1.0
+    vecs = tf * idf
+    norms = np.linalg.norm(vecs, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vecs / norms
+
+
+def _codes(df, col):
+    if col not in df.columns:
+        return np.zeros(len(df), dtype=np.int64)
+    _, inverse = np.unique(df[col].astype(str).to_numpy(), return_inverse=True)
+    return inverse
+
+
+class SimilarItems:
+    """Top-k similar products (row ids) per product, for one catalog version."""
+
+    def __init__(self, df, top_k=TOP_K):
+        self.top_k = top_k
+        self.n = len(df)
+        self.neighbours = np.full((self.n, top_k), -1, dtype=np.int32)  # row ids (-1 = none)
+        self._row_of_code = {}
+
+        if self.n < 2 or 'name' not in df.columns:
+            return
+
+        brand = df['brand'].astype(str) if 'brand' in df.columns else [''] * self.n
+        texts = [normalize_text(f"{b} {nm}") for b, nm in zip(brand, df['name'].astype(str))]
+        vecs = _text_vectors(texts)
+
+        brand_codes = _codes(df, 'brand')
+        size_codes = _codes(df, 'size')
+        block_codes = _codes(df, 'category')
+        price = df['price'].to_numpy(dtype=np.float64) if 'price' in df.columns else np.zeros(self.n)
+        log_price = np.log1p(np.maximum(price, 0)).astype(np.float32)
+        available = ~df['is_sold'].to_numpy(dtype=bool) if 'is_sold' in df.columns else np.ones(self.n, bool)
+
+        half = WINDOW // 2
+        for block in np.unique(block_codes):
+            rows = np.flatnonzero(block_codes == block)
+            rows = rows[np.argsort(log_price[rows], kind='stable')]   # 가격순 → 가까운 가격대가 이웃
+            m = len(rows)
+            for start in range(0, m, CHUNK):
+                q = rows[start:start + CHUNK]
+                lo, hi = max(0, start - half), min(m, start + len(q) + half)
+                c = rows[lo:hi]
+
+                score = vecs[q] @ vecs[c].T
+                score += W_BRAND * (brand_codes[q][:, None] == brand_codes[c][None, :])
+                score += W_SIZE * (size_codes[q][:, None] == size_codes[c][None, :])
+                score -= W_PRICE * np.abs(log_price[q][:, None] - log_price[c][None, :])
+                score[:, ~available[c]] = -np.inf
+                score[q[:, None] == c[None, :]] = -np.inf   # 자기 자신 제외
+
+                k = min(top_k, len(c))
+                top = np.argpartition(-score, k - 1, axis=1)[:, :k]
+                top_scores = np.take_along_axis(score, top, axis=1)
+                order = np.argsort(-top_scores, axis=1, kind='stable')
+                top = np.take_along_axis(top, order, axis=1)
+                top_scores = np.take_along_axis(top_scores, order, axis=1)
+                result = np.where(np.isfinite(top_scores), c[top], -1)
+                self.neighbours[q, :k] = result
+
+        codes = df['code'].astype(str).tolist() if 'code' in df.columns else [str(i) for i in range(self.n)]
+        self._row_of_code = {code: i for i, code in enumerate(codes)}
+
+    def similar_rows(self, code):
+        """Row ids of the most similar items (for Catalog.take)."""
+        row = self._row_of_code.get(str(code))
+        if row is None:
+            return np.zeros(0, dtype=np.int32)
+        nb = self.neighbours[row]
+        return nb[nb >= 0]